@@ -0,0 +1,3 @@
+"""
+Benchmarks for thefuzz, run with ``python -m benchmarks --help``
+"""
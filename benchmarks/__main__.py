@@ -0,0 +1,139 @@
+"""
+Run the benchmark scenarios and optionally compare them with a baseline.
+
+    python -m benchmarks --output baseline.json
+    # upgrade thefuzz or rapidfuzz
+    python -m benchmarks --baseline baseline.json --threshold 0.1
+
+The exit status is 1 when a scenario is slower than the baseline by more
+than the threshold.
+"""
+import argparse
+import datetime
+import fnmatch
+import json
+import platform
+import sys
+import timeit
+
+import rapidfuzz
+
+import thefuzz
+from .scenarios import all_scenarios
+
+
+def measure(statement, repeat, min_time):
+    timer = timeit.Timer(statement)
+    number = 1
+    while True:
+        duration = timer.timeit(number)
+        if duration >= min_time:
+            break
+        number *= 10 if duration < min_time / 10 else 2
+
+    timings = [duration] + timer.repeat(repeat - 1, number)
+    return {
+        "number": number,
+        "best": min(timings) / number,
+        "mean": sum(timings) / len(timings) / number,
+    }
+
+
+def run(patterns, sizes, lengths, repeat, min_time):
+    results = {}
+    for name, scenario in all_scenarios().items():
+        if patterns and not any(fnmatch.fnmatch(name, p) for p in patterns):
+            continue
+
+        for size in sizes:
+            for length in lengths:
+                key = f"{name}(size={size}, length={length})"
+                results[key] = measure(scenario(size, length), repeat, min_time)
+                print(f"{key:<70} {format_time(results[key]['best'])}", file=sys.stderr)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the change of every scenario against the baseline and return the
+    names of the scenarios that regressed by more than threshold
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+
+        change = result["best"] / baseline[key]["best"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "REGRESSION"
+            regressions.append(key)
+        print(f"{key:<70} {format_time(baseline[key]['best'])} -> "
+              f"{format_time(result['best'])} {change:+7.1%} {flag}", file=sys.stderr)
+
+    return regressions
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.3f}{unit}"
+    return f"{seconds / 1e-9:8.3f}ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("patterns", nargs="*",
+                        help="glob patterns of the scenarios to run, e.g. 'fuzz.*' (default: all)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="number of choices or string pairs (default: 1000 10000)")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 50],
+                        help="length of the generated strings (default: 10 50)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of timings per scenario (default: 5)")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="minimum duration of a single timing in seconds (default: 0.2)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed slowdown against the baseline (default: 0.1 = 10%%)")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(all_scenarios()))
+        return 0
+
+    results = run(args.patterns, args.sizes, args.lengths, args.repeat, args.min_time)
+    report = {
+        "meta": {
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "thefuzz": thefuzz.__version__,
+            "rapidfuzz": rapidfuzz.__version__,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
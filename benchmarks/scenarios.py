@@ -0,0 +1,202 @@
+"""
+Benchmark scenarios.
+
+Every scenario is a function taking the corpus size and string length and
+returning the statement to time. All data is read from data/titledata.csv
+or generated from a fixed seed, so runs are reproducible and offline.
+"""
+import csv
+import functools
+import os
+import random
+import string
+
+from thefuzz import fuzz, index, process, utils
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "data", "titledata.csv")
+
+SCORERS = [
+    fuzz.ratio,
+    fuzz.partial_ratio,
+    fuzz.token_sort_ratio,
+    fuzz.token_set_ratio,
+    fuzz.partial_token_sort_ratio,
+    fuzz.partial_token_set_ratio,
+    fuzz.QRatio,
+    fuzz.UQRatio,
+    fuzz.WRatio,
+    fuzz.UWRatio,
+]
+
+MIXED_STRINGS = [
+    "Lorem Ipsum is simply dummy text of the printing and typesetting industry.",
+    "C'est la vie",
+    "\u00c7a va?",
+    "C\u00e3es danados",
+    "\xacCamar\u00f5es assados",
+    "a\xac\u1234\u20ac\U00008000",
+]
+
+QUERY = "new york yankees vs boston red sox"
+
+
+@functools.lru_cache(maxsize=None)
+def titles():
+    with open(DATA_PATH, encoding="utf-8") as f:
+        return [row["custom_title"] for row in csv.DictReader(f, delimiter="|")]
+
+
+# accented letters, and the Latin-1 symbols ascii_only removes
+ACCENTED = "\u00e0\u00e1\u00e2\u00e3\u00e7\u00e8\u00e9\u00ea\u00f1\u00f3\u00f5\u00fc\u00df\u00c7\u00c9\xac\xb0"
+
+
+@functools.lru_cache(maxsize=None)
+def random_strings(size, length, seed=18, extra=""):
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "       " + extra
+    return [
+        "".join(rng.choice(alphabet) for _ in range(length))
+        for _ in range(size)
+    ]
+
+
+def corpus(size, length):
+    """
+    size choices: the real world titles, padded with random strings of the
+    given length
+    """
+    choices = titles()[:size]
+    return choices + random_strings(size - len(choices), length)
+
+
+def full_process(size, length, force_ascii):
+    strings = MIXED_STRINGS + random_strings(size, length)
+
+    def run():
+        for s in strings:
+            utils.full_process(s, force_ascii=force_ascii)
+
+    return run
+
+
+def ascii_only(size, length, function, extra=""):
+    # with extra=ACCENTED nearly every string contains non-ASCII characters,
+    # so the str.isascii shortcut is not taken
+    strings = MIXED_STRINGS + random_strings(size, length, extra=extra)
+
+    def run():
+        for s in strings:
+            function(s)
+
+    return run
+
+
+def translation_table(s):
+    # the previous implementation of ascii_only, without the str.isascii
+    # shortcut, kept to compare against
+    return s.translate(utils.translation_table)
+
+
+def score_pairs(size, length, scorer):
+    pairs = list(zip(random_strings(size, length, seed=1), random_strings(size, length, seed=2)))
+
+    def run():
+        for s1, s2 in pairs:
+            scorer(s1, s2)
+
+    return run
+
+
+def score_many(size, length, scorer):
+    choices = random_strings(size, length)
+    return lambda: scorer(QUERY, choices)
+
+
+def extract(size, length, function, scorer=fuzz.WRatio, **kwargs):
+    choices = corpus(size, length)
+
+    if function is process.extractWithoutOrder:
+        return lambda: list(function(QUERY, choices, scorer=scorer, **kwargs))
+    return lambda: function(QUERY, choices, scorer=scorer, **kwargs)
+
+
+def extract_many(size, length):
+    choices = corpus(size, length)
+    queries = titles()[:10]
+    return lambda: process.extract_many(queries, choices)
+
+
+def match_lists(size, length):
+    choices = corpus(size, length)
+    left = titles()[:10]
+    return lambda: list(process.match_lists(left, choices))
+
+
+def choice_index(size, length, cls=process.ChoiceIndex, **kwargs):
+    choice_index = cls(corpus(size, length), **kwargs)
+    score_cutoff = 90 if kwargs else 0
+    return lambda: choice_index.extractOne(QUERY, score_cutoff=score_cutoff)
+
+
+def extract_stream(size, length):
+    choices = corpus(size, length)
+    return lambda: process.extract_stream(QUERY, iter(choices))
+
+
+def dedupe(size, length, function):
+    # dedupe is quadratic, so it uses a tenth of the corpus
+    choices = corpus(max(1, size // 10), length)
+    return lambda: function(choices)
+
+
+def sort_by_ratio(size, length):
+    # real world usage: sort choices by their similarity to a query
+    choices = corpus(size, length)
+    prepared_ratio = functools.partial(fuzz.ratio, "New York Yankees")
+    return lambda: sorted(choices, key=prepared_ratio)
+
+
+def all_scenarios():
+    """
+    Mapping of scenario name to a function (size, length) -> statement
+    """
+    scenarios = {
+        "utils.full_process": functools.partial(full_process, force_ascii=False),
+        "utils.full_process/force_ascii": functools.partial(full_process, force_ascii=True),
+        "utils.ascii_only": functools.partial(ascii_only, function=utils.ascii_only),
+        "utils.ascii_only/translation_table": functools.partial(ascii_only, function=translation_table),
+        "utils.ascii_fold": functools.partial(ascii_only, function=utils.ascii_fold),
+    }
+    for name in ["utils.ascii_only", "utils.ascii_only/translation_table", "utils.ascii_fold"]:
+        scenarios[name + "/non_ascii"] = functools.partial(scenarios[name], extra=ACCENTED)
+
+    for s in SCORERS:
+        scenarios["fuzz." + s.__name__] = functools.partial(score_pairs, scorer=s)
+        scenarios["fuzz." + s.__name__ + "_many"] = functools.partial(
+            score_many, scorer=getattr(fuzz, s.__name__ + "_many"))
+
+    for f in [process.extractOne, process.extract, process.extractBests, process.extractWithoutOrder]:
+        scenarios["process." + f.__name__] = functools.partial(extract, function=f)
+    scenarios["process.extractBests/QRatio"] = functools.partial(
+        extract, function=process.extractBests, scorer=fuzz.QRatio)
+    for s in [fuzz.WRatio, fuzz.partial_ratio]:
+        scenarios["process.extractBests/adaptive_cutoff/" + s.__name__] = functools.partial(
+            extract, function=process.extractBests, scorer=s, adaptive_cutoff=True)
+    scenarios["process.extractBests/partial_ratio"] = functools.partial(
+        extract, function=process.extractBests, scorer=fuzz.partial_ratio)
+    scenarios["process.extract_many"] = extract_many
+    scenarios["process.match_lists"] = match_lists
+    scenarios["process.ChoiceIndex.extractOne"] = choice_index
+    for cls in [process.ChoiceIndex, index.LengthIndex, index.BKTreeIndex]:
+        scenarios[cls.__module__.rpartition(".")[2] + "." + cls.__name__ + ".extractOne/ratio/score_cutoff"] = functools.partial(
+            choice_index, cls=cls, scorer=fuzz.ratio)
+    for cls in [process.ChoiceIndex, index.MinHashIndex]:
+        scenarios[cls.__module__.rpartition(".")[2] + "." + cls.__name__ + ".extractOne/token_set_ratio/score_cutoff"] = functools.partial(
+            choice_index, cls=cls, scorer=fuzz.token_set_ratio)
+    scenarios["process.extract_stream"] = extract_stream
+    scenarios["process.dedupe"] = functools.partial(dedupe, function=process.dedupe)
+    scenarios["process.dedupe_blocked"] = functools.partial(dedupe, function=process.dedupe_blocked)
+    scenarios["process.Deduper.add"] = functools.partial(dedupe, function=lambda choices: process.Deduper().add(choices))
+    scenarios["real_world.sort_by_ratio"] = sort_by_ratio
+
+    return scenarios
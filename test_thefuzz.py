@@ -1,11 +1,40 @@
+import asyncio
+import contextlib
+import csv
+import io
+import json
+import os
 import unittest
 import re
+import tempfile
+from functools import partial
 import pycodestyle
 
+from thefuzz import aio
+from thefuzz import cli
+from thefuzz import corpus
+from thefuzz import dataframe
 from thefuzz import fuzz
+from thefuzz import index
+from thefuzz import instrument
 from thefuzz import process
 from thefuzz import utils
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
 scorers = [
     fuzz.ratio,
     fuzz.partial_ratio,
@@ -19,6 +48,11 @@ scorers = [
     fuzz.UWRatio,
 ]
 
+
+def length_scorer(s1, s2):
+    return 100 - abs(len(s1) - len(s2))
+
+
 class StringProcessingTest(unittest.TestCase):
     def test_replace_non_letters_non_numbers_with_whitespace(self):
         strings = ["new york mets - atlanta braves", "Cães danados",
@@ -67,6 +101,17 @@ class UtilsTest(unittest.TestCase):
         for s in self.mixed_strings:
             utils.ascii_only(s)
 
+    def test_asciiOnlyMatchesTranslationTable(self):
+        for s in self.mixed_strings:
+            self.assertEqual(utils.ascii_only(s), s.translate(utils.translation_table))
+
+    def test_asciiFold(self):
+        self.assertEqual(utils.ascii_fold("C\u00e3es danados"), "Caes danados")
+        self.assertEqual(utils.ascii_fold("\u00C1"), "A")
+        self.assertEqual(utils.ascii_fold("a\xac\u1234\u20ac\U00008000"), "a")
+        for s in self.mixed_strings:
+            self.assertTrue(utils.ascii_fold(s).isascii())
+
     def test_fullProcess(self):
         for s in self.mixed_strings:
             utils.full_process(s)
@@ -75,6 +120,45 @@ class UtilsTest(unittest.TestCase):
         for s in self.mixed_strings:
             utils.full_process(s, force_ascii=True)
 
+    def test_fullProcessTransliteration(self):
+        self.assertEqual(utils.full_process("\u00c7a va?", force_ascii=True, transliterate=True), "ca va")
+        self.assertEqual(utils.full_process("\u00c7a va?", transliterate=True), "\u00e7a va")
+        self.assertEqual(utils.full_process("\u00c7a va?", force_ascii=True), "a va")
+
+        utils.enable_cache()
+        try:
+            self.assertEqual(utils.full_process("\u00c7a va?", force_ascii=True), "a va")
+            self.assertEqual(utils.full_process("\u00c7a va?", force_ascii=True, transliterate=True), "ca va")
+        finally:
+            utils.disable_cache()
+
+        choices = ["creme brulee", "crepes"]
+        self.assertEqual(process.extractOne("Cr\u00e8me br\u00fbl\u00e9e", choices, scorer=fuzz.QRatio)[1], 86)
+        transliterate = partial(utils.full_process, force_ascii=True, transliterate=True)
+        self.assertEqual(process.extractOne("Cr\u00e8me br\u00fbl\u00e9e", choices, processor=transliterate,
+                                            scorer=fuzz.QRatio), ("creme brulee", 100))
+
+    def test_fullProcessCache(self):
+        self.assertIsNone(utils.cache_info())
+        utils.enable_cache(maxsize=2)
+        try:
+            for s in self.mixed_strings:
+                self.assertEqual(utils.full_process(s), utils.full_process(s))
+                self.assertNotEqual(utils.full_process(s, force_ascii=True), None)
+
+            info = utils.cache_info()
+            self.assertEqual(info.hits, len(self.mixed_strings))
+            self.assertEqual(info.misses, 2 * len(self.mixed_strings))
+            self.assertEqual(info.currsize, 2)
+
+            utils.cache_clear()
+            self.assertEqual(utils.cache_info().currsize, 0)
+            self.assertEqual(fuzz.WRatio(self.s1, self.s2), 100)
+        finally:
+            utils.disable_cache()
+
+        self.assertIsNone(utils.cache_info())
+
 
 class RatioTest(unittest.TestCase):
 
@@ -181,6 +265,46 @@ class RatioTest(unittest.TestCase):
         self.assertEqual(fuzz.ratio("", ""), 100)
         self.assertEqual(fuzz.partial_ratio("", ""), 100)
 
+    def testScoreCache(self):
+        cache = utils.ScoreCache(maxsize=2)
+        fuzz.set_score_cache(cache)
+        try:
+            self.assertEqual(fuzz.WRatio(self.s1, self.s2), 100)
+            self.assertEqual(fuzz.UWRatio(self.s1, self.s2), 100)
+            self.assertEqual(fuzz.ratio(self.s1, self.s3), fuzz.ratio(self.s1, self.s3))
+            self.assertEqual(fuzz.token_set_ratio(self.s4, self.s5), 100)
+        finally:
+            fuzz.set_score_cache(None)
+
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (2, 3, 2))
+
+    def testScoreCacheTTL(self):
+        backend = {}
+        cache = utils.ScoreCache(ttl=60, backend=backend)
+        fuzz.set_score_cache(cache)
+        try:
+            score = fuzz.QRatio(self.s1, self.s3)
+            key = cache.make_key("QRatio", self.s1, self.s3)
+            self.assertEqual(backend[key][0], score)
+
+            # expired entries are recalculated
+            backend[key] = (-1, 0)
+            self.assertEqual(fuzz.QRatio(self.s1, self.s3), score)
+            self.assertEqual(cache.hits, 0)
+        finally:
+            fuzz.set_score_cache(None)
+
+    def testScorersMany(self):
+        choices = self.cirque_strings + self.baseball_strings + ["", None, "\u00C1"]
+        for scorer in scorers:
+            scorer_many = getattr(fuzz, scorer.__name__ + "_many")
+            for query in [self.s1, self.s6, "", "\u00C1"]:
+                expected = [0 if choice is None else scorer(query, choice) for choice in choices]
+                self.assertEqual(list(scorer_many(query, choices)), expected)
+
+        self.assertEqual(list(fuzz.WRatio_many(None, choices)), [0] * len(choices))
+        self.assertEqual(fuzz.QRatio_many(self.s1, iter([self.s2])).tolist(), [100])
+
     def testIssueSeven(self):
         s1 = "HSINCHUANG"
         s2 = "SINJHUAN"
@@ -462,6 +586,22 @@ class ProcessTest(unittest.TestCase):
         best = process.extractOne(query, choices)
         self.assertEqual(best[0], choices[1])
 
+    def test_extract_one_processes_query_once(self):
+        # full_process(force_ascii=True) is not idempotent for "\u0178": it
+        # lowercases to "\u00ff", which a second pass removes
+        choices = ["es", "\u00ffes"]
+        for query in ["\u0178es", "new york mets"]:
+            expected = process.extractBests(query, choices, limit=1)[0]
+            self.assertEqual(process.extractOne(query, choices), expected)
+            self.assertEqual(process.extractOne(query, iter(choices)), expected)
+            self.assertEqual(process.extractOne(query, dict(enumerate(choices))), expected + (choices.index(expected[0]),))
+        self.assertEqual(process.extractOne("\u0178es", choices), ("es", 90))
+
+        # a processor processing like the scorer is still followed by the
+        # processing of the scorer
+        processor = partial(utils.full_process, force_ascii=True)
+        self.assertEqual(process.extractBests("\u0178es", choices, processor=processor, limit=1), [("es", 100)])
+
     def test_list_like_extract(self):
         """We should be able to use a list-like object for choices."""
         def generate_choices():
@@ -487,6 +627,22 @@ class ProcessTest(unittest.TestCase):
         for value, confidence, key in result:
             self.assertIn(value, choices.values())
 
+    @unittest.skipIf(pd is None, "requires pandas")
+    def test_series_with_duplicate_labels(self):
+        choices = pd.Series(["new york jets", "new york mets", "boston"], index=["a", "a", "b"])
+        expected = [("new york jets", 90, "a"), ("new york mets", 90, "a"), ("boston", 14, "b")]
+        self.assertEqual(process.extractBests("new york", choices), expected)
+        self.assertEqual(process.extractBests("new york", choices, adaptive_cutoff=True), expected)
+        self.assertEqual(process.extractOne("new york", choices), expected[0])
+        self.assertEqual(process.extractBests("new york", choices, workers=2), expected)
+        # missing values of a Series are NaN, which is skipped like None
+        with_missing = pd.Series(["new york jets", None, float("nan")], index=["a", "b", "c"])
+        self.assertEqual(process.extractBests("new york", with_missing), [("new york jets", 90, "a")])
+        self.assertEqual(process.ChoiceIndex(choices).extractBests("new york"), expected)
+        self.assertEqual(process.extract_many(["new york"], choices), [expected])
+        self.assertEqual(list(process.match_lists({"q": "new york"}, choices, limit=2)),
+                         [("q", "a", 90), ("q", "a", 90)])
+
     def test_dedupe(self):
         """We should be able to use a list-like object for contains_dupes
         """
@@ -505,6 +661,94 @@ class ProcessTest(unittest.TestCase):
         result = process.dedupe(contains_dupes)
         self.assertEqual(result, deduped_list)
 
+    def test_dedupe_blocked(self):
+        contains_dupes = ['Frodo Baggin', 'Frodo Baggins', 'F. Baggins', 'Samwise G.', 'Gandalf', 'Bilbo Baggins']
+
+        result = process.dedupe_blocked(contains_dupes)
+        self.assertEqual(sorted(result), sorted(process.dedupe(contains_dupes)))
+
+        # every item is represented by its longest match
+        contains_dupes = ['new york mets', 'new york mets vs braves', 'chicago', 'ny mets vs braves']
+        result = process.dedupe_blocked(contains_dupes, threshold=80)
+        self.assertEqual(result, ['new york mets vs braves', 'chicago'])
+
+        # titles with typos, which would chain into a few clusters if matches were followed transitively
+        with open(os.path.join(os.path.dirname(__file__), "data", "titledata.csv"), encoding="utf-8") as f:
+            titles = list(dict.fromkeys(row["custom_title"] for row in csv.DictReader(f, delimiter="|")))[:300]
+        titles += [title[:i % len(title)] + "x" + title[i % len(title) + 1:] for i, title in enumerate(titles[::2])]
+        for threshold in (70, 90):
+            expected = process.dedupe(titles, threshold=threshold)
+            self.assertEqual(sorted(process.dedupe_blocked(titles, threshold=threshold)), sorted(expected))
+
+        contains_dupes = ['Tom', 'Dick', 'Harry']
+        self.assertIs(process.dedupe_blocked(contains_dupes), contains_dupes)
+
+        # buckets over max_bucket_size are skipped, equal processed items are still duplicates
+        contains_dupes = ['new york mets', 'New York Mets!', 'new york mets', 'new york met', 'chicago']
+        self.assertEqual(process.dedupe_blocked(contains_dupes, threshold=90, max_bucket_size=1),
+                         ['New York Mets!', 'new york met', 'chicago'])
+        self.assertEqual(process.dedupe_blocked(contains_dupes, threshold=90, max_bucket_size=None),
+                         ['New York Mets!', 'chicago'])
+        deduper = process.Deduper(threshold=90, max_bucket_size=1)
+        deduper.add(contains_dupes)
+        self.assertEqual(deduper.representatives(), ['New York Mets!', 'new york met', 'chicago'])
+
+    def test_deduper(self):
+        contains_dupes = ['new york mets', 'chicago', 'new york mets vs braves', 'ny mets vs braves', '', 'Chicago!']
+
+        deduper = process.Deduper(threshold=80)
+        self.assertEqual(deduper.add(contains_dupes[:3]), [0, 1, 0])
+        # the last batch links new york mets vs braves to a new item
+        self.assertEqual(deduper.add(contains_dupes[3:]), [0, 4, 1])
+        self.assertEqual(len(deduper), 6)
+        self.assertEqual(deduper.clusters(), {0: ['new york mets', 'new york mets vs braves', 'ny mets vs braves'],
+                                              1: ['chicago', 'Chicago!'], 4: ['']})
+        self.assertEqual(deduper.representative(deduper.cluster_id(3)), 'new york mets vs braves')
+        self.assertEqual(deduper.representatives(), process.dedupe_blocked(contains_dupes, threshold=80))
+
+        # every batch size and candidate index gives the same clusters
+        titles = [title for title, _ in process.extract('new york', self.baseball_strings, limit=None)] * 3
+        expected = process.dedupe_blocked(titles, threshold=90)
+        for batch_size in (1, 4, len(titles)):
+            deduper = process.Deduper(threshold=90)
+            for i in range(0, len(titles), batch_size):
+                deduper.add(titles[i:i + batch_size])
+            self.assertEqual(deduper.representatives(), expected)
+
+        processed = []
+
+        def processor(s):
+            processed.append(s)
+            return s
+
+        deduper = process.Deduper(threshold=90, index=process.ChoiceIndex([], processor=processor,
+                                                                          scorer=fuzz.token_set_ratio))
+        deduper.add(titles)
+        self.assertEqual(deduper.representatives(), expected)
+        # every item is processed once
+        self.assertEqual(processed, titles)
+
+        deduper = process.Deduper(threshold=90, representatives_only=False)
+        deduper.add(titles)
+        self.assertEqual(deduper.representatives(), expected)
+
+        # titles with typos do not chain into a few clusters, but every item is in one
+        # cluster only, so there are fewer clusters than items kept by dedupe()
+        with open(os.path.join(os.path.dirname(__file__), "data", "titledata.csv"), encoding="utf-8") as f:
+            titles = list(dict.fromkeys(row["custom_title"] for row in csv.DictReader(f, delimiter="|")))[:300]
+        titles += [title[:i % len(title)] + "x" + title[i % len(title) + 1:] for i, title in enumerate(titles[::2])]
+        for threshold, fraction in ((70, 1 / 3), (90, 3 / 4)):
+            expected = process.dedupe(titles, threshold=threshold)
+            deduper = process.Deduper(threshold=threshold)
+            cluster_ids = deduper.add(titles)
+            self.assertTrue(len(expected) * fraction < len(deduper.representatives()) <= len(expected))
+            batches = process.Deduper(threshold=threshold)
+            self.assertEqual([cluster_id for i in range(0, len(titles), 7)
+                              for cluster_id in batches.add(titles[i:i + 7])], cluster_ids)
+
+        with self.assertRaises(ValueError):
+            process.Deduper(index=process.ChoiceIndex(['x']))
+
     def test_simplematch(self):
         basic_string = 'a, b'
         match_strings = ['a, b']
@@ -515,6 +759,757 @@ class ProcessTest(unittest.TestCase):
         self.assertEqual(result, ('a, b', 100))
         self.assertEqual(part_result, ('a, b', 100))
 
+    def test_extract_many(self):
+        queries = ["new york mets at chicago cubs", "zarakana bellagio"]
+        choices = self.baseball_strings + self.cirque_strings + [None]
+
+        for scorer in scorers:
+            result = process.extract_many(queries, choices, scorer=scorer, limit=3)
+            expected = [process.extractBests(query, choices, scorer=scorer, limit=3)
+                        for query in queries]
+            self.assertEqual(result, expected)
+
+        choices_dict = dict(enumerate(self.baseball_strings))
+        result = process.extract_many(queries, choices_dict, score_cutoff=50)
+        expected = [process.extractBests(query, choices_dict, score_cutoff=50)
+                    for query in queries]
+        self.assertEqual(result, expected)
+
+    def test_partial_scorer_lowering(self):
+        scorer = partial(fuzz.token_set_ratio, force_ascii=False)
+        self.assertEqual(process._lower_scorer(scorer)[1:], (False, True))
+        self.assertIsNone(process._lower_scorer(partial(fuzz.ratio, force_ascii=False)))
+        self.assertIsNone(process._lower_scorer(partial(fuzz.WRatio, "new york")))
+
+        query = "cirque du soleil ca va"
+        choices = self.cirque_strings + ["\u00c7a va?"]
+        for scorer in [partial(fuzz.token_set_ratio, force_ascii=False),
+                       partial(fuzz.WRatio, full_process=False),
+                       partial(fuzz.UQRatio, full_process=True)]:
+            expected = [(choice, scorer(query, choice)) for choice in choices]
+            result = process.extractWithoutOrder(query, choices, processor=None, scorer=scorer)
+            self.assertEqual(list(result), expected)
+
+    def test_scorer_with_score_cutoff(self):
+        calls = []
+
+        def scorer(s1, s2, score_cutoff=0):
+            calls.append(score_cutoff)
+            return fuzz.ratio(s1, s2)
+
+        query = "new york mets at chicago cubs"
+        best = process.extractOne(query, self.baseball_strings, scorer=scorer, score_cutoff=50)
+        self.assertEqual(best, (self.baseball_strings[0], fuzz.ratio(query, self.baseball_strings[0])))
+        # the cutoff is raised to the best score found so far
+        self.assertEqual(calls[0], 50)
+        self.assertEqual(calls[-1], best[1])
+
+    def test_workers(self):
+        query = "new york mets at chicago cubs"
+        choices = self.baseball_strings + self.cirque_strings + ["", None]
+        choices_dict = dict(enumerate(choices))
+
+        for scorer in [fuzz.WRatio, fuzz.ratio, length_scorer, lambda s1, s2: len(s2)]:
+            self.assertEqual(process.extract(query, choices, scorer=scorer, limit=None, workers=3),
+                             process.extract(query, choices, scorer=scorer, limit=None))
+            self.assertEqual(process.extractBests(query, choices_dict, scorer=scorer, score_cutoff=30, workers=3),
+                             process.extractBests(query, choices_dict, scorer=scorer, score_cutoff=30))
+            self.assertEqual(process.extractOne(query, choices, scorer=scorer, workers=-1),
+                             process.extractOne(query, choices, scorer=scorer))
+
+        contains_dupes = ['Frodo Baggin', 'Frodo Baggins', 'F. Baggins', 'Samwise G.', 'Gandalf', 'Bilbo Baggins']
+        self.assertEqual(sorted(process.dedupe(contains_dupes, workers=2)),
+                         sorted(process.dedupe(contains_dupes)))
+        self.assertEqual(sorted(process.dedupe(contains_dupes, threshold=95, scorer=length_scorer, workers=2)),
+                         sorted(process.dedupe(contains_dupes, threshold=95, scorer=length_scorer)))
+
+    def test_extract_stream(self):
+        query = "new york mets at chicago cubs"
+        choices = self.baseball_strings + self.cirque_strings + ["", None]
+
+        for scorer in [fuzz.WRatio, fuzz.ratio, lambda s1, s2: len(s2) // 10]:
+            for limit in [1, 3, None]:
+                result = process.extract_stream(query, iter(choices), scorer=scorer, limit=limit, chunk_size=3)
+                self.assertEqual(result, process.extractBests(query, choices, scorer=scorer, limit=limit))
+
+        choices_dict = dict(enumerate(choices))
+        self.assertEqual(process.extract_stream(query, choices_dict, score_cutoff=50, chunk_size=2),
+                         process.extractBests(query, choices_dict, score_cutoff=50))
+
+    def test_adaptive_cutoff(self):
+        query = "new york mets at chicago cubs"
+        choices = self.baseball_strings + self.cirque_strings + ["", None] + self.baseball_strings
+        choices_dict = dict(enumerate(choices))
+
+        chunk_size = process._ADAPTIVE_CHUNK_SIZE
+        process._ADAPTIVE_CHUNK_SIZE = 2
+        try:
+            for scorer in [fuzz.WRatio, fuzz.partial_ratio, length_scorer, lambda s1, s2: len(s2) // 10]:
+                for limit in [1, 3, None]:
+                    self.assertEqual(
+                        process.extractBests(query, choices, scorer=scorer, limit=limit, adaptive_cutoff=True),
+                        process.extractBests(query, choices, scorer=scorer, limit=limit))
+                self.assertEqual(process.extract(query, choices_dict, scorer=scorer, adaptive_cutoff=True),
+                                 process.extract(query, choices_dict, scorer=scorer))
+
+            stats = process.ExtractStats()
+            process.extractBests(query, choices, limit=2, adaptive_cutoff=True, stats=stats)
+            self.assertEqual(stats.choices, len(choices) - 1)
+            self.assertGreater(stats.pruned, 0)
+            self.assertGreater(stats.score_cutoff, 0)
+
+            # two perfect matches end the search after the first chunk
+            stats = process.ExtractStats()
+            result = process.extractBests(query, [query, query] + choices, limit=2, adaptive_cutoff=True, stats=stats)
+            self.assertEqual(result, [(query, 100), (query, 100)])
+            self.assertEqual(stats.pruned, len(choices) - 1)
+        finally:
+            process._ADAPTIVE_CHUNK_SIZE = chunk_size
+
+        with self.assertRaises(ValueError):
+            process.extractBests(query, choices, adaptive_cutoff=True, workers=2)
+
+    def test_match_lists(self):
+        left = ["new york mets at chicago cubs", None, "zarkana las vegas", "braves vs mets"]
+        right = self.baseball_strings + self.cirque_strings + ["", None]
+
+        expected = []
+        for i, query in enumerate(left):
+            if query is not None:
+                expected.extend((i, right.index(choice), score)
+                                for choice, score in process.extractBests(query, right, score_cutoff=50, limit=2))
+
+        self.assertEqual(list(process.match_lists(left, right, score_cutoff=50, limit=2)), expected)
+        self.assertEqual(list(process.match_lists(left, right, score_cutoff=50, limit=2, workers=2, chunk_size=1)),
+                         expected)
+
+        right_dict = {f"r{i}": choice for i, choice in enumerate(right)}
+        results = list(process.match_lists(dict(enumerate(left)), right_dict, scorer=fuzz.ratio))
+        self.assertEqual(results, [(i, "r" + str(right.index(process.extractOne(query, right, scorer=fuzz.ratio)[0])),
+                                    process.extractOne(query, right, scorer=fuzz.ratio)[1])
+                                   for i, query in enumerate(left) if query is not None])
+
+        # a prebuilt index blocks on shared tokens
+        tokens = index.TokenIndex(right, fallback=False)
+        self.assertEqual(list(process.match_lists(["zarkana", "xyz"], tokens)), [(0, 4, 90)])
+
+    def test_read_choices(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "choices.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(self.baseball_strings) + "\n")
+
+            self.assertEqual(list(process.read_choices(path)), self.baseball_strings)
+            best = process.extract_stream("braves vs mets", process.read_choices(path), limit=1)
+            self.assertEqual(best, [("braves vs mets", 100)])
+
+    def test_choice_index(self):
+        query = "new york mets at chicago cubs"
+        choices = self.baseball_strings + ["", None]
+
+        for scorer in scorers:
+            index = process.ChoiceIndex(choices, scorer=scorer)
+            self.assertEqual(index.extractOne(query),
+                             process.extractOne(query, choices, scorer=scorer))
+            self.assertEqual(index.extract(query, limit=2),
+                             process.extract(query, choices, scorer=scorer, limit=2))
+            self.assertEqual(index.extractBests(query, score_cutoff=50, limit=None),
+                             process.extractBests(query, choices, scorer=scorer, score_cutoff=50, limit=None))
+            self.assertEqual(list(index.extractWithoutOrder(query)),
+                             list(process.extractWithoutOrder(query, choices, scorer=scorer)))
+
+        self.assertIsNone(process.ChoiceIndex(choices).extractOne("dallas", score_cutoff=90))
+
+    def test_choice_index_dict(self):
+        query = "new york mets at chicago cubs"
+        choices = dict(enumerate(self.baseball_strings))
+
+        index = process.ChoiceIndex(choices)
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.extractOne(query), process.extractOne(query, choices))
+        self.assertEqual(index.extract(query), process.extract(query, choices))
+
+    def test_choice_index_with_processor(self):
+        events = [
+            ["chicago cubs vs new york mets", "CitiField", "2011-05-11", "8pm"],
+            ["new york yankees vs boston red sox", "Fenway Park", "2011-05-11", "8pm"],
+        ]
+        query = ["new york mets vs chicago cubs", "CitiField", "2017-03-19", "8pm"]
+
+        index = process.ChoiceIndex(events, processor=lambda event: event[0])
+        best = index.extractOne(query)
+        self.assertEqual(best[0], events[0])
+
+    @unittest.skipIf(np is None, "requires numpy")
+    def test_cdist(self):
+        queries = ["new york mets at chicago cubs", "zarakana bellagio"]
+        choices = self.baseball_strings + [None]
+
+        result = process.cdist(queries, choices)
+        self.assertEqual(result.shape, (2, 5))
+        for i, query in enumerate(queries):
+            for j, choice in enumerate(choices[:-1]):
+                self.assertEqual(result[i, j], fuzz.WRatio(query, choice))
+            self.assertEqual(result[i, -1], 0)
+
+        if pd is not None:
+            series = pd.Series(choices, index=["a", "a", "b", "c", "d"])
+            self.assertEqual(process.cdist(queries, series).tolist(), result.tolist())
+
+
+class IndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.choices = [
+            "new york mets vs chicago cubs",
+            "chicago cubs at new york mets",
+            "atlanta braves vs pittsbugh pirates",
+            "new york yankees vs boston red sox",
+            "",
+            None,
+        ]
+
+    def test_token_index(self):
+        query = "new york mets at chicago cubs"
+        full = process.ChoiceIndex(self.choices)
+        tokens = index.TokenIndex(self.choices)
+
+        self.assertEqual(tokens.extractOne(query), full.extractOne(query))
+        self.assertEqual(tokens.extractBests(query, score_cutoff=50), full.extractBests(query, score_cutoff=50))
+        self.assertEqual(tokens._candidates("pirates at dodgers", 0), [1, 2])
+
+        # typos are only found with n-grams
+        tokens = index.TokenIndex(self.choices, fallback=False)
+        self.assertIsNone(tokens.extractOne("yankes", score_cutoff=50))
+        trigrams = index.TokenIndex(self.choices, ngram_size=3, fallback=False)
+        self.assertEqual(trigrams.extractOne("yankes", score_cutoff=50)[0], self.choices[3])
+
+    def test_token_index_full_scan(self):
+        tokens = index.TokenIndex(self.choices, fallback=False)
+        self.assertEqual(tokens.extractBests("bravs", limit=None), [])
+        tokens.full_scan = True
+        self.assertEqual(tokens.extractBests("bravs", limit=None),
+                         process.extractBests("bravs", self.choices, limit=None))
+
+        tokens = index.TokenIndex(self.choices)
+        self.assertEqual(tokens.extractBests("bravs", limit=None),
+                         process.extractBests("bravs", self.choices, limit=None))
+
+    def test_token_index_max_postings(self):
+        tokens = index.TokenIndex(self.choices, max_postings=2)
+        self.assertEqual(tokens._candidates("new york braves", 0), [2])
+
+    def test_token_index_most_choices(self):
+        # more than half of the choices are candidates, so every choice is scored
+        tokens = index.TokenIndex(self.choices, fallback=False)
+        self.assertIsNone(tokens._candidates("new york braves", 0))
+        self.assertEqual(tokens._candidates("chicago braves", 0), [0, 1, 2])
+        self.assertEqual(tokens.extractBests("new york braves", limit=None),
+                         process.ChoiceIndex(self.choices).extractBests("new york braves", limit=None))
+
+    def test_updates(self):
+        query = "new york mets at chicago cubs"
+        for cls in [process.ChoiceIndex, index.TokenIndex, index.LengthIndex]:
+            live = cls(dict(enumerate(self.choices)))
+            live.add("chicago cubs at new york mets tonight", key="tonight")
+            live.update(0, "new york mets at chicago cubs")
+            live.remove(1)
+            live.add("yankees", key=3)
+            with self.assertRaises(KeyError):
+                live.remove(1)
+
+            expected = {0: "new york mets at chicago cubs", 2: self.choices[2], 3: "yankees",
+                        4: "", 5: None, "tonight": "chicago cubs at new york mets tonight"}
+            rebuilt = cls(expected)
+            self.assertEqual(len(live), len(expected))
+            for score_cutoff in [0, 60, 95]:
+                self.assertEqual(live.extractBests(query, score_cutoff=score_cutoff, limit=None),
+                                 rebuilt.extractBests(query, score_cutoff=score_cutoff, limit=None))
+            self.assertEqual(live.extractOne("yankees", score_cutoff=90), ("yankees", 100, 3))
+
+            live = cls(self.choices)
+            self.assertEqual(live.add("braves vs mets"), len(self.choices))
+            live.remove(2)
+            live.update(0, "braves vs mets")
+            self.assertEqual(live.extractBests("braves vs mets", score_cutoff=90), [("braves vs mets", 100)] * 2)
+            with self.assertRaises(TypeError):
+                live.add("braves", key="braves")
+
+    def test_length_index(self):
+        choices = self.choices + ["a", "new york mets", "new york mets vs atlanta braves at citi field tonight"]
+        query = "new york mets at chicago cubs"
+
+        for scorer in [fuzz.ratio, fuzz.QRatio, fuzz.WRatio, fuzz.UWRatio, fuzz.token_set_ratio]:
+            full = process.ChoiceIndex(choices, scorer=scorer)
+            lengths = index.LengthIndex(choices, scorer=scorer)
+            for score_cutoff in [0, 50, 80, 91, 96]:
+                self.assertEqual(lengths.extractBests(query, score_cutoff=score_cutoff, limit=None),
+                                 full.extractBests(query, score_cutoff=score_cutoff, limit=None))
+                self.assertEqual(lengths.extractOne(query, score_cutoff=score_cutoff),
+                                 full.extractOne(query, score_cutoff=score_cutoff))
+
+        lengths = index.LengthIndex(choices, scorer=fuzz.ratio)
+        self.assertEqual(lengths._candidates("new york mets", 90), [7])
+        self.assertEqual(lengths._candidates("", 90), [4])
+        self.assertIsNone(lengths._candidates("new york mets", 0))
+        self.assertIsNone(index.LengthIndex(choices, scorer=fuzz.partial_ratio)._candidates("new york mets", 90))
+
+    def test_bk_tree_index(self):
+        choices = ["apple", "appel", "aple", "apply", "maple", "apple", "", "applesauce", "banana", "bananas"]
+        queries = ["apple", "aplpe", "banan", "", "pineapple"]
+
+        for scorer in [fuzz.ratio, fuzz.QRatio, fuzz.UQRatio, fuzz.WRatio]:
+            full = process.ChoiceIndex(choices, scorer=scorer)
+            tree = index.BKTreeIndex(choices, scorer=scorer, max_distance=10)
+            for query in queries:
+                for score_cutoff in [0, 50, 80, 90, 100]:
+                    self.assertEqual(tree.extractBests(query, score_cutoff=score_cutoff, limit=None),
+                                     full.extractBests(query, score_cutoff=score_cutoff, limit=None))
+
+        tree = index.BKTreeIndex(choices, scorer=fuzz.ratio)
+        # a score_cutoff of 80 allows a distance of 2, 90 a distance of 1
+        self.assertEqual(tree._candidates("apple", 80), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(tree._candidates("apple", 90), [0, 2, 5])
+        self.assertEqual(tree._candidates("", 90), [6])
+        self.assertIsNone(tree._candidates("applesauce", 80))
+        self.assertIsNone(tree._candidates("apple", 0))
+
+        tree.remove(0)
+        tree.update(5, "banana")
+        tree.add("apple")
+        self.assertEqual(tree._candidates("apple", 90), [2, 10])
+        self.assertEqual(tree.extractBests("banana", score_cutoff=90), [("banana", 100), ("banana", 100), ("bananas", 92)])
+
+        # nodes without choices are dropped once they are half of the tree
+        full = process.ChoiceIndex(choices, scorer=fuzz.ratio)
+        full.remove(0)
+        full.update(5, "banana")
+        full.add("apple")
+        for position in [1, 3, 4, 7, 9]:
+            tree.remove(position)
+            full.remove(position)
+        self.assertEqual(sorted(tree._nodes), ["", "aple", "apple", "banana"])
+        self.assertEqual(tree._dead_nodes, 0)
+        for query in queries:
+            self.assertEqual(tree.extractBests(query, score_cutoff=80, limit=None),
+                             full.extractBests(query, score_cutoff=80, limit=None))
+
+    def test_min_hash_index(self):
+        choices = ["new york mets vs chicago cubs", "chicago cubs vs new york mets", "", None,
+                   "atlanta braves vs pittsburgh pirates", "new york mets vs chicago cubs tonight"]
+        lsh = index.MinHashIndex(choices)
+        full = process.ChoiceIndex(choices, scorer=fuzz.token_set_ratio)
+
+        # equal token sets always share every band, disjoint ones practically never
+        self.assertEqual(lsh._candidates("cubs chicago vs mets york new", 90)[:2], [0, 1])
+        self.assertEqual(lsh._candidates("boston red sox at toronto blue jays", 90), [])
+        self.assertEqual(lsh._candidates("", 90), [])
+        self.assertEqual(lsh.extractBests("chicago cubs at new york mets", score_cutoff=90),
+                         full.extractBests("chicago cubs at new york mets", score_cutoff=90))
+
+        # the bands and rows derived from the Jaccard similarity of the matches
+        self.assertEqual((lsh.bands, lsh.rows), (16, 2))
+        derived = index.MinHashIndex(choices, threshold=0.9)
+        self.assertEqual((derived.bands, derived.rows, len(derived._permutations)), (5, 6, 30))
+        # a subset of the tokens of a choice scores 100 with a low Jaccard similarity
+        derived = index.MinHashIndex(choices, num_perm=64, threshold=0.25)
+        self.assertEqual(derived.extractBests("chicago cubs", score_cutoff=90),
+                         full.extractBests("chicago cubs", score_cutoff=90))
+
+        lsh.update(4, "chicago cubs vs new york mets")
+        lsh.remove(0)
+        self.assertEqual(lsh._candidates("new york mets vs chicago cubs", 90)[:2], [1, 4])
+
+        deduper = process.Deduper(threshold=90, index=index.MinHashIndex([]))
+        deduper.add([choice for choice in choices if choice is not None])
+        self.assertEqual(deduper.representatives(), ["new york mets vs chicago cubs tonight", "",
+                                                     "atlanta braves vs pittsburgh pirates"])
+
+        with self.assertRaises(ValueError):
+            index.MinHashIndex(choices, num_perm=30, bands=16)
+        with self.assertRaises(ValueError):
+            index.MinHashIndex(choices, threshold=0)
+        with self.assertRaises(ValueError):
+            index.MinHashIndex(choices, threshold=0.5, recall=1)
+
+    @unittest.skipIf(np is None, "requires numpy")
+    def test_min_hash_index_numpy(self):
+        choices = ["new york mets vs chicago cubs", "", None, "atlanta braves vs pittsburgh pirates",
+                   "chicago cubs at new york mets"] * 3
+        lsh = index.MinHashIndex(choices, num_perm=8, bands=4)
+        for processed in ["new york mets vs chicago cubs", "atlanta braves"]:
+            self.assertEqual(lsh._batch_band_keys([processed, None]), [lsh._band_keys(processed), None])
+
+        index.np, numpy = None, index.np
+        try:
+            self.assertEqual(index.MinHashIndex(choices, num_perm=8, bands=4)._buckets, lsh._buckets)
+        finally:
+            index.np = numpy
+
+
+class InstrumentTest(unittest.TestCase):
+
+    def setUp(self):
+        self.choices = [
+            "new york mets vs chicago cubs",
+            "chicago cubs at new york mets",
+            "atlanta braves vs pittsbugh pirates",
+            "new york yankees vs boston red sox",
+            None,
+        ]
+        self.query = "new york mets at chicago cubs"
+        self.collector = instrument.Collector()
+
+    def tearDown(self):
+        instrument.set_hook(None)
+        fuzz.set_score_cache(None)
+
+    def test_process(self):
+        expected = [
+            process.extractBests(self.query, self.choices, limit=2),
+            process.extractOne(self.query, self.choices),
+            list(process.extractWithoutOrder(self.query, self.choices)),
+            process.dedupe(self.choices[:4]),
+        ]
+
+        instrument.set_hook(self.collector)
+        self.assertIs(instrument.get_hook(), self.collector)
+        self.assertEqual([
+            process.extractBests(self.query, self.choices, limit=2),
+            process.extractOne(self.query, self.choices),
+            list(process.extractWithoutOrder(self.query, self.choices)),
+            process.dedupe(self.choices[:4]),
+        ], expected)
+
+        totals = self.collector.totals
+        self.assertEqual(totals["process.extractBests"].choices, 4)
+        self.assertEqual(totals["process.extractBests"].matches, 2)
+        self.assertEqual(totals["process.extractOne"].matches, 1)
+        self.assertEqual(totals["process.extractWithoutOrder"].matches, 4)
+        self.assertEqual(totals["process.dedupe"].choices, 16)
+        self.assertGreater(totals["process.extractBests"].processing_time, 0)
+        self.assertGreater(totals["process.extractBests"].scoring_time, 0)
+        self.assertEqual(self.collector.calls["process.extractBests"], 1)
+
+    def test_choice_index(self):
+        tokens = index.TokenIndex(self.choices, fallback=False)
+        expected = [tokens.extractBests("braves"), tokens.extractOne("braves"),
+                    list(tokens.extractWithoutOrder("braves"))]
+
+        instrument.set_hook(self.collector)
+        self.assertEqual([tokens.extractBests("braves"), tokens.extractOne("braves"),
+                          list(tokens.extractWithoutOrder("braves"))], expected)
+
+        stats = self.collector.totals["process.ChoiceIndex.extractOne"]
+        self.assertEqual((stats.choices, stats.pruned, stats.matches), (1, 3, 1))
+        self.assertEqual(len(self.collector.totals), 3)
+
+        choice_index = process.ChoiceIndex(self.choices)
+        choice_index.remove(0)
+        choice_index.extractOne(self.query)
+        stats = self.collector.totals["process.ChoiceIndex.extractOne"]
+        self.assertEqual((stats.choices, stats.pruned), (1 + 3, 3 + 0))
+
+    def test_closed_generator(self):
+        instrument.set_hook(self.collector)
+        results = process.extractWithoutOrder(self.query, self.choices)
+        next(results)
+        results.close()
+        self.assertEqual(self.collector.calls["process.extractWithoutOrder"], 1)
+        self.assertEqual(self.collector.totals["process.extractWithoutOrder"].choices, 4)
+
+    def test_scorers(self):
+        fuzz.set_score_cache(utils.ScoreCache())
+        instrument.set_hook(self.collector)
+        self.assertEqual(fuzz.WRatio(self.query, self.choices[0]), 93)
+        self.assertEqual(fuzz.WRatio(self.query, self.choices[0]), 93)
+        self.assertEqual(list(fuzz.ratio_many(self.query, self.choices)), [fuzz.ratio(self.query, c) for c in self.choices])
+
+        stats = self.collector.totals["fuzz.WRatio"]
+        self.assertEqual((stats.choices, stats.cache_hits, stats.cache_misses), (2, 1, 1))
+        self.assertEqual(self.collector.totals["fuzz.ratio_many"].choices, 4)
+
+        self.collector.clear()
+        instrument.set_hook(None)
+        fuzz.WRatio(self.query, self.choices[0])
+        self.assertEqual(self.collector.totals, {})
+
+
+class CorpusTest(unittest.TestCase):
+
+    def setUp(self):
+        self.choices = [
+            "new york mets vs chicago cubs",
+            "chicago cubs at new york mets",
+            "atlanta braves vs pittsbugh pirates",
+            "new york yankees vs boston red sox",
+            "C\u00e3es danados",
+            "",
+        ]
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "choices.corpus")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_build(self):
+        self.assertEqual(corpus.build(self.path, iter(self.choices)), len(self.choices))
+        with corpus.Corpus(self.path) as c:
+            self.assertEqual(len(c), len(self.choices))
+            self.assertEqual(list(c.choices), self.choices)
+            self.assertEqual(c.choices[-2], self.choices[-2])
+            self.assertEqual(c.choices[1:3], self.choices[1:3])
+            self.assertEqual(list(c.processed), [utils.full_process(s, force_ascii=True) for s in self.choices])
+            with self.assertRaises(IndexError):
+                c.choices[len(self.choices)]
+
+        corpus.build(self.path, self.choices, full_process=False)
+        with corpus.Corpus(self.path) as c:
+            self.assertIs(c.processed, c.choices)
+            self.assertIsNone(c.force_ascii)
+
+        with self.assertRaises(TypeError):
+            corpus.build(self.path, ["a", None])
+
+    def test_choice_index(self):
+        query = "new york mets at chicago cubs"
+        corpus.build(self.path, self.choices)
+        with corpus.Corpus(self.path) as c:
+            for cls in [process.ChoiceIndex, index.TokenIndex, index.LengthIndex]:
+                self.assertEqual(cls(c).extractBests(query, limit=None),
+                                 cls(self.choices).extractBests(query, limit=None))
+            self.assertEqual(process.ChoiceIndex(c, scorer=fuzz.QRatio).extractOne(query),
+                             process.extractOne(query, self.choices, scorer=fuzz.QRatio))
+
+            for scorer in [fuzz.UWRatio, fuzz.ratio]:
+                with self.assertRaises(ValueError):
+                    process.ChoiceIndex(c, scorer=scorer)
+            with self.assertRaises(ValueError):
+                process.ChoiceIndex(c, processor=lambda s: s)
+
+        corpus.build(self.path, self.choices, force_ascii=False)
+        with corpus.Corpus(self.path) as c:
+            self.assertEqual(process.ChoiceIndex(c, scorer=fuzz.ratio).extractOne(query),
+                             process.extractOne(query, self.choices, scorer=fuzz.ratio))
+
+        with corpus.Corpus(self.path, decode=True) as c:
+            self.assertIsInstance(c.processed, list)
+            self.assertEqual(process.ChoiceIndex(c, scorer=fuzz.ratio).extractOne(query),
+                             process.extractOne(query, self.choices, scorer=fuzz.ratio))
+
+        transliterate = partial(utils.full_process, force_ascii=True, transliterate=True)
+        corpus.build(self.path, self.choices, transliterate=True)
+        with corpus.Corpus(self.path) as c:
+            self.assertTrue(c.transliterate)
+            self.assertEqual(c.processed[-2], "caes danados")
+            self.assertEqual(process.ChoiceIndex(c, processor=transliterate).extractOne("Caes"),
+                             process.extractOne("Caes", self.choices, processor=transliterate))
+            with self.assertRaises(ValueError):
+                process.ChoiceIndex(c)
+
+    def test_main(self):
+        input_path = os.path.join(self.tmpdir.name, "choices.txt")
+        with open(input_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.choices) + "\n")
+
+        corpus.main(["build", input_path, self.path, "--no-force-ascii"])
+        with corpus.Corpus(self.path) as c:
+            self.assertEqual(list(c.choices), self.choices)
+            self.assertFalse(c.force_ascii)
+
+
+@unittest.skipIf(pd is None, "requires pandas")
+class DataFrameTest(unittest.TestCase):
+    def setUp(self):
+        self.left = pd.DataFrame({"name": ["new york mets", "Chicago Cubs", None, "zzz"], "id": [1, 2, 3, 4]},
+                                 index=[10, 11, 12, 13])
+        self.right = pd.DataFrame({"name": ["New York Mets", "chicago cubs!", "Boston Red Sox"],
+                                   "city": ["NY", "CHI", "BOS"]}, index=["a", "b", "c"])
+
+    def test_score_pairs(self):
+        other = pd.Series(["new york mets vs atlanta braves", "cubs", "x", None])
+        for scorer in (fuzz.WRatio, fuzz.token_sort_ratio, length_scorer):
+            scores = dataframe.score_pairs(self.left["name"], other, scorer=scorer)
+            self.assertEqual(list(scores.index), [10, 11, 12, 13])
+            self.assertEqual(list(scores[:2]), [process.extractOne(a, [b], scorer=scorer)[1]
+                                                for a, b in zip(self.left["name"][:2], other[:2])])
+            self.assertEqual(scores[13], 0)
+
+        with self.assertRaises(ValueError):
+            dataframe.score_pairs(self.left["name"], other[:2])
+
+    def test_extract_one(self):
+        result = dataframe.extract_one(self.left["name"], self.right["name"], score_cutoff=50)
+        self.assertEqual(list(result.index), [10, 11, 12, 13])
+        for query, (match, score, key) in zip(self.left["name"][:2], result.itertuples(index=False)):
+            self.assertEqual((match, score, key), process.extractOne(query, self.right["name"].to_dict()))
+        self.assertTrue(result.iloc[2:].isna().all(axis=None))
+
+    def test_extract_one_choice_index(self):
+        expected = dataframe.extract_one(self.left["name"], self.right["name"], score_cutoff=50)
+        for choices in (self.right["name"].to_dict(), self.right["name"]):
+            result = dataframe.extract_one(self.left["name"], process.ChoiceIndex(choices), score_cutoff=50)
+            self.assertTrue(result.equals(expected))
+
+        result = dataframe.extract_one(self.left["name"], process.ChoiceIndex(list(self.right["name"])), score_cutoff=50)
+        self.assertEqual(list(result["key"][:2]), [0, 1])
+
+    @unittest.skipIf(pa is None, "requires pyarrow")
+    def test_extract_one_arrow(self):
+        result = dataframe.extract_one(pa.array(["new york mets", None]), pa.chunked_array([["Boston", "New York Mets"]]))
+        self.assertEqual(tuple(result.iloc[0]), ("New York Mets", 100, 1))
+        self.assertTrue(result.iloc[1].isna().all())
+
+    def test_fuzzy_merge(self):
+        result = dataframe.fuzzy_merge(self.left, self.right, "name", "name", score_cutoff=80)
+        self.assertEqual(list(result.columns), ["name_x", "id", "name_y", "city", "score"])
+        self.assertEqual(result.values.tolist(), [["new york mets", 1, "New York Mets", "NY", 100],
+                                                  ["Chicago Cubs", 2, "chicago cubs!", "CHI", 100]])
+
+        result = dataframe.fuzzy_merge(self.left, self.right, "name", "name", score_cutoff=80, how="left")
+        self.assertEqual(list(result["id"]), [1, 2, 3, 4])
+        self.assertEqual(list(result["city"][:2]), ["NY", "CHI"])
+        self.assertTrue(result.iloc[2:][["name_y", "city", "score"]].isna().all(axis=None))
+
+        result = dataframe.fuzzy_merge(self.left, self.right, "name", "name", limit=2, scorer=fuzz.token_sort_ratio)
+        self.assertEqual(list(result["id"]), [1, 1, 2, 2, 4, 4])
+        self.assertEqual(list(result["score"][:2]),
+                         [score for _, score in process.extract("new york mets", self.right["name"].tolist(),
+                                                                scorer=fuzz.token_sort_ratio, limit=2)])
+
+        with self.assertRaises(ValueError):
+            dataframe.fuzzy_merge(self.left, self.right, "name", "name", how="outer")
+
+
+class AsyncProcessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.choices = [
+            "new york mets vs chicago cubs",
+            "chicago cubs at new york mets",
+            "atlanta braves vs pittsbugh pirates",
+            "new york yankees vs boston red sox",
+            None,
+        ]
+
+    def test_extract(self):
+        query = "new york mets at chicago cubs"
+        choices_dict = dict(enumerate(self.choices))
+
+        self.assertEqual(asyncio.run(aio.extractOne(query, self.choices, chunk_size=2)),
+                         process.extractOne(query, self.choices))
+        self.assertEqual(asyncio.run(aio.extract(query, choices_dict, limit=3, chunk_size=2)),
+                         process.extract(query, choices_dict, limit=3))
+        self.assertEqual(asyncio.run(aio.extractBests(query, self.choices, scorer=fuzz.QRatio, score_cutoff=50)),
+                         process.extractBests(query, self.choices, scorer=fuzz.QRatio, score_cutoff=50))
+        self.assertIsNone(asyncio.run(aio.extractOne("dallas", self.choices, score_cutoff=90)))
+
+    def test_cancel(self):
+        async def run():
+            task = asyncio.ensure_future(aio.extractOne("new york", self.choices * 1000, chunk_size=1))
+            await asyncio.sleep(0)
+            task.cancel()
+            await task
+
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(run())
+
+
+class CliTest(unittest.TestCase):
+
+    def setUp(self):
+        self.choices = ["new york mets vs chicago cubs", "atlanta braves vs pittsbugh pirates",
+                        "new york yankees vs boston red sox", "chicago cubs at new york mets"]
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def write(self, name, text):
+        with open(self.path(name), "w") as f:
+            f.write(text)
+        return self.path(name)
+
+    def read_jsonl(self, name):
+        with open(self.path(name)) as f:
+            return [json.loads(line) for line in f]
+
+    def test_extract_one(self):
+        queries = self.write("queries.jsonl", '{"id": "a", "name": "new york yankees"}\n{"id": "b", "name": null}\n'
+                                              '"cubs at mets"\n')
+        choices = self.write("choices.csv", "team|key\n" + "".join(f"{c}|k{i}\n" for i, c in enumerate(self.choices)))
+
+        cli.main(["extractOne", queries, choices, "--query-column", "name", "--query-id", "id", "--delimiter", "|",
+                  "--choice-id", "key", "--workers", "2", "--chunk-size", "1", "--output", self.path("out.jsonl")])
+        rows = self.read_jsonl("out.jsonl")
+        self.assertEqual([row["query_id"] for row in rows], ["a", 2])
+        for row in rows:
+            match, score = process.extractOne(row["query"], self.choices)
+            self.assertEqual((row["match"], row["score"]), (match, score))
+            self.assertEqual(row["choice_id"], f"k{self.choices.index(match)}")
+
+    def test_extract_bests(self):
+        queries = self.write("queries.txt", "new york\n\ncubs\n")
+        choices = self.write("choices.txt", "\n".join(self.choices))
+        cli.main(["extractBests", queries, choices, "--scorer", "token_set_ratio", "--limit", "2",
+                  "--score-cutoff", "50", "--output", self.path("out.csv")])
+
+        with open(self.path("out.csv"), newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], list(cli.OUTPUT_FIELDS))
+        for query_id, query in ((0, "new york"), (2, "cubs")):
+            expected = [[str(query_id), query, str(self.choices.index(match)), match, str(score)]
+                        for match, score in process.extractBests(query, self.choices, scorer=fuzz.token_set_ratio,
+                                                                 score_cutoff=50, limit=2)]
+            self.assertEqual([row for row in rows[1:] if row[0] == str(query_id)], expected)
+
+    def test_no_process(self):
+        queries = self.write("queries.txt", "NEW YORK!!\n")
+        choices = self.write("choices.txt", "new york\n")
+        for scorer, expected in (("WRatio", 11), ("token_set_ratio", 11), ("ratio", 11)):
+            cli.main(["extractOne", queries, choices, "--no-process", "--scorer", scorer,
+                      "--output", self.path("out.jsonl")])
+            self.assertEqual([row["score"] for row in self.read_jsonl("out.jsonl")], [expected])
+
+        cli.main(["extractOne", queries, choices, "--output", self.path("out.jsonl")])
+        self.assertEqual([row["score"] for row in self.read_jsonl("out.jsonl")], [100])
+
+    def test_dedupe(self):
+        values = self.write("values.txt", "\n".join(["Frodo Baggin", "Frodo Baggins", "F. Baggins", "Samwise G.",
+                                                     "Gandalf", "Bilbo Baggins"]))
+        cli.main(["dedupe", values, "--output", self.path("out.jsonl")])
+        self.assertEqual(sorted(row["value"] for row in self.read_jsonl("out.jsonl")),
+                         sorted(process.dedupe(["Frodo Baggin", "Frodo Baggins", "F. Baggins", "Samwise G.",
+                                                "Gandalf", "Bilbo Baggins"])))
+
+    def test_read_records(self):
+        path = self.write("records.jsonl", '{"name": "x"}\n')
+        with self.assertRaises(ValueError):
+            list(cli.read_records(path))
+        self.assertEqual(list(cli.read_records(path, column="name")), [(0, "x")])
+
+        path = self.path("records.csv")
+        with open(path, "w", newline="") as f:
+            f.write('name,id\r\n"a\r\nb",1\r\n')
+        self.assertEqual(list(cli.read_records(path, id_column="id")), [("1", "a\r\nb")])
+        with self.assertRaises(ValueError):
+            cli.read_records(path, column="missing")
+
+    def test_bad_input(self):
+        output = self.write("out.csv", "existing\n")
+        choices = self.write("choices.txt", "\n".join(self.choices))
+        for argv in (["extractOne", self.path("missing.txt"), choices],
+                     ["extractOne", choices, self.path("missing.txt")],
+                     ["extractOne", choices, self.write("choices.csv", "name\nx\n"), "--choice-column", "team"],
+                     ["dedupe", self.path("missing.txt")]):
+            with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                cli.main(argv + ["--output", output])
+            with open(output) as f:
+                self.assertEqual(f.read(), "existing\n")
+
 
 class TestCodeFormat(unittest.TestCase):
     def test_pep8_conformance(self):
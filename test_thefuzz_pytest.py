@@ -7,6 +7,7 @@ def test_process_warning(caplog):
     query = ':::::::'
     choices = [':::::::']
 
+    process._empty_query_warnings.clear()
     _ = process.extractOne(query, choices)
 
     logstr = ("Applied processor reduces "
@@ -20,3 +21,17 @@ def test_process_warning(caplog):
     assert log.levelname == "WARNING"
     assert log.name == "thefuzz.process"
     assert logstr == log.message
+
+
+def test_process_warning_rate_limited(caplog):
+    """Check that the warning is logged once per query, not once per call"""
+
+    process._empty_query_warnings.clear()
+    for _ in range(3):
+        process.extractOne(':::::::', [':::::::'])
+        process.extractBests('???', ['???'])
+        list(process.extractWithoutOrder(':::::::', [':::::::']))
+
+    assert 2 == len(caplog.records)
+    assert "[Query: ':::::::']" in caplog.records[0].message
+    assert "[Query: '???']" in caplog.records[1].message
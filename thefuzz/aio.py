@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+asyncio versions of the process.extract* functions.
+
+The choices are scored chunk by chunk in an executor, so the event loop
+keeps running other tasks while a large list of choices is searched.
+Cancelling the task stops the extraction after the chunk that is being
+scored at that moment.
+"""
+import asyncio
+import typing as t
+from functools import partial
+
+from . import process
+from .process import (
+    _Choices, _ChoicesMap, _MappedResult, _Processor, _Result, _Scorer, _T,
+    default_processor, default_scorer,
+)
+
+
+async def extractBests(
+    query: str,
+    choices: t.Union[_ChoicesMap[_T], _Choices],
+    processor: t.Optional[_Processor] = default_processor,
+    scorer: _Scorer = default_scorer,
+    score_cutoff: t.Optional[float] = 0,
+    limit: t.Optional[int] = 5,
+    chunk_size: int = 10000,
+    executor=None,
+) -> t.Union[t.List[_MappedResult[_T]], t.List[_Result]]:
+    """
+    Get a list of the best matches to a collection of choices.
+
+    See process.extractBests() for the arguments and results.
+
+    Args:
+        chunk_size: The number of choices scored in the executor at a time.
+            Smaller chunks return control to the event loop more often.
+            Defaults to 10000.
+        executor: The concurrent.futures.Executor used for scoring. Defaults
+            to the default executor of the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    is_mapping = hasattr(choices, "items")
+    is_lowered = process._is_lowered(scorer)
+
+    processor = process._get_processor(processor, scorer)
+    rf_scorer = process._get_scorer(scorer)
+    processed_query = process._preprocess_query(query, processor)
+
+    best = process._BestMatches(limit)
+    for chunk in process._iter_chunks(choices, chunk_size):
+        results = await loop.run_in_executor(executor, partial(
+            process._extract_chunk, processed_query, chunk, processor, rf_scorer, score_cutoff, limit
+        ))
+        best.add(chunk, results)
+
+    return best.results(is_mapping, is_lowered)
+
+
+async def extract(
+    query: str,
+    choices: t.Union[_ChoicesMap[_T], _Choices],
+    processor: t.Optional[_Processor] = default_processor,
+    scorer: _Scorer = default_scorer,
+    limit: t.Optional[int] = 5,
+    chunk_size: int = 10000,
+    executor=None,
+) -> t.Union[t.List[_MappedResult[_T]], t.List[_Result]]:
+    """
+    Select the best match in a list or dictionary of choices.
+
+    See process.extract() for the arguments and results, and extractBests()
+    for chunk_size and executor.
+    """
+    return await extractBests(query, choices, processor=processor, scorer=scorer, limit=limit,
+                              chunk_size=chunk_size, executor=executor)
+
+
+async def extractOne(
+    query: str,
+    choices: t.Union[_ChoicesMap[_T], _Choices],
+    processor: t.Optional[_Processor] = default_processor,
+    scorer: _Scorer = default_scorer,
+    score_cutoff: t.Optional[float] = 0,
+    chunk_size: int = 10000,
+    executor=None,
+) -> t.Optional[t.Union[_MappedResult[_T], _Result]]:
+    """
+    Find the single best match above a score in a list of choices.
+
+    See process.extractOne() for the arguments and results, and extractBests()
+    for chunk_size and executor.
+    """
+    results = await extractBests(query, choices, processor=processor, scorer=scorer,
+                                 score_cutoff=score_cutoff, limit=1,
+                                 chunk_size=chunk_size, executor=executor)
+    return results[0] if results else None
@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+"""
+Bulk matching of CSV, JSONL and text files from the command line.
+
+    python -m thefuzz extractOne queries.csv choices.csv --query-column name
+    python -m thefuzz extractBests queries.jsonl choices.txt --limit 3 --output matches.jsonl
+    python -m thefuzz dedupe names.txt --threshold 90
+
+Queries are read and matched chunk by chunk and results are written as
+soon as they are found, so only the choices and the chunks in flight are
+held in memory. Choices are processed a single time (see
+process.match_lists). The format of a file is taken from its extension:
+.csv, .tsv, .jsonl/.ndjson, .corpus (see thefuzz.corpus, for choices) and
+anything else, including stdin, is read as one value per line.
+
+Every result is written as a row with the columns query_id, query,
+choice_id, match and score. The ids are the values of --query-id and
+--choice-id, or the row numbers counting from 0. Queries without a match
+of at least --score-cutoff are not written. dedupe writes a single column,
+value.
+"""
+import argparse
+import contextlib
+import csv
+import functools
+import inspect
+import json
+import os
+import sys
+import time
+
+from . import fuzz
+from . import process
+
+SCORERS = (
+    "ratio", "partial_ratio", "token_sort_ratio", "token_set_ratio",
+    "partial_token_sort_ratio", "partial_token_set_ratio",
+    "QRatio", "UQRatio", "WRatio", "UWRatio",
+)
+
+OUTPUT_FIELDS = ("query_id", "query", "choice_id", "match", "score")
+
+
+def _file_format(path, default="csv"):
+    if path == "-":
+        return default
+    name = path.lower()
+    for suffix, fmt in ((".csv", "csv"), (".tsv", "tsv"), (".jsonl", "jsonl"), (".ndjson", "jsonl"),
+                        (".corpus", "corpus")):
+        if name.endswith(suffix):
+            return fmt
+    return "text"
+
+
+def _open(path, encoding, mode="r"):
+    if path == "-":
+        return contextlib.nullcontext(sys.stdin if mode == "r" else sys.stdout)
+    # the csv module handles the line endings itself, including the ones in
+    # quoted fields, and the text and JSONL readers strip them
+    return open(path, mode, encoding=encoding, newline="")
+
+
+def read_records(path, column=None, id_column=None, delimiter=",", encoding="utf-8"):
+    """
+    Lazily read (id, value) pairs from a CSV, JSONL or text file.
+
+    The file is opened, and the header of a CSV file is checked, right
+    away, so that a missing file or column raises before anything is read.
+
+    Args:
+        path: The file to read, - for stdin
+        column: The CSV column or JSON field with the value. Defaults to the
+            first column of a CSV file. The lines of a JSONL file can also be
+            JSON strings, which are used as they are.
+        id_column: The CSV column or JSON field with the id. Defaults to the
+            row number, counting from 0.
+        delimiter: The delimiter of CSV files. Defaults to "," (tab for .tsv).
+        encoding: The encoding of the file. Defaults to utf-8.
+
+    Returns: A generator of (id, value) tuples. Missing and empty values are None.
+    """
+    records = _read_records(path, column, id_column, delimiter, encoding)
+    next(records)  # runs up to the first record
+    return records
+
+
+def _read_records(path, column, id_column, delimiter, encoding):
+    fmt = _file_format(path, default="text")
+    with _open(path, encoding) as f:
+        if fmt in ("csv", "tsv"):
+            reader = csv.DictReader(f, delimiter="\t" if fmt == "tsv" else delimiter)
+            if column is None:
+                column = reader.fieldnames[0] if reader.fieldnames else None
+            for name in (column, id_column):
+                if name is not None and reader.fieldnames is not None and name not in reader.fieldnames:
+                    raise ValueError(f"{path}: there is no column {name!r}")
+            yield
+            for i, row in enumerate(reader):
+                yield (i if id_column is None else row.get(id_column)), (row.get(column) or None)
+
+        elif fmt == "jsonl":
+            yield
+            for i, line in enumerate(line for line in f if line.strip()):
+                row = json.loads(line)
+                if isinstance(row, dict):
+                    if column is None:
+                        raise ValueError(f"{path}: the records are JSON objects, the field has to be set")
+                    yield (i if id_column is None else row.get(id_column)), (row.get(column) or None)
+                else:
+                    yield i, row
+
+        else:
+            yield
+            for i, line in enumerate(f):
+                yield i, (line.rstrip("\r\n") or None)
+
+
+class _Records:
+    """
+    Generator of (key, value) pairs in the form of a mapping, for
+    process.match_lists, which only calls items() and keeps left lazy
+    """
+
+    def __init__(self, pairs):
+        self._pairs = pairs
+
+    def items(self):
+        return self._pairs
+
+
+class _Writer:
+    """
+    Writes result rows as CSV or JSONL
+    """
+
+    def __init__(self, f, fmt, delimiter, fields):
+        self._f = f
+        self._fields = fields
+        self._csv = None
+        if fmt in ("csv", "tsv"):
+            self._csv = csv.writer(f, delimiter="\t" if fmt == "tsv" else delimiter, lineterminator="\n")
+            self._csv.writerow(fields)
+
+    def write(self, row):
+        if self._csv is not None:
+            self._csv.writerow(row)
+        else:
+            self._f.write(json.dumps(dict(zip(self._fields, row))) + "\n")
+
+
+class _Progress:
+    """
+    Counts the records read from a generator and reports them on stderr
+    at most once per interval
+    """
+
+    def __init__(self, enabled, interval=1.0):
+        self.count = 0
+        self._enabled = enabled
+        self._interval = interval
+        self._start = self._last = time.monotonic()
+
+    def wrap(self, pairs):
+        for pair in pairs:
+            self.count += 1
+            if self._enabled:
+                now = time.monotonic()
+                if now - self._last >= self._interval:
+                    self._last = now
+                    self._report(now)
+            yield pair
+
+    def _report(self, now):
+        rate = self.count / (now - self._start) if now > self._start else 0
+        print(f"read {self.count} queries ({rate:.0f}/s)", file=sys.stderr)
+
+
+def _load_choices(args):
+    if _file_format(args.choices) == "corpus":
+        from . import corpus
+        # every query scores all the choices, so they are decoded a single time
+        return corpus.Corpus(args.choices, decode=True)
+
+    records = read_records(args.choices, args.choice_column, args.choice_id, args.delimiter, args.encoding)
+    if args.choice_id is None:
+        return [value for _, value in records]
+    return dict(records)
+
+
+def _match(args, open_writer):
+    scorer = getattr(fuzz, args.scorer or "WRatio")
+    processor = process.default_processor
+    if args.no_process:
+        processor = None
+        # processor=None leaves the processing of the scorers forcing ASCII
+        # and the token scorers in place
+        if "full_process" in inspect.signature(scorer).parameters:
+            scorer = functools.partial(scorer, full_process=False)
+    choices = _load_choices(args)
+    index = process.ChoiceIndex(choices, processor=processor, scorer=scorer)
+    # choice ids are the positions for lists and a corpus, and the keys for dictionaries
+    lookup = getattr(choices, "choices", choices)
+
+    progress = _Progress(args.progress)
+    queries = read_records(args.queries, args.query_column, args.query_id, args.delimiter, args.encoding)
+    # the key of every query is its (id, value) pair
+    left = _Records(((pair, pair[1]) for pair in progress.wrap(queries)))
+    writer = open_writer()
+
+    limit = 1 if args.command == "extractOne" else args.limit
+    count = 0
+    for (query_id, query), choice_id, score in process.match_lists(
+            left, index, score_cutoff=args.score_cutoff, limit=limit, workers=args.workers,
+            chunk_size=args.chunk_size):
+        writer.write((query_id, query, choice_id, lookup[choice_id], score))
+        count += 1
+
+    return f"matched {progress.count} queries, wrote {count} results"
+
+
+def _dedupe(args, open_writer):
+    scorer = getattr(fuzz, args.scorer or "token_set_ratio")
+    items = [value for _, value in read_records(args.input, args.column, None, args.delimiter, args.encoding)
+             if value is not None]
+    writer = open_writer()
+    if args.blocked:
+        deduped = process.dedupe_blocked(items, threshold=args.threshold, scorer=scorer)
+    else:
+        deduped = process.dedupe(items, threshold=args.threshold, scorer=scorer, workers=args.workers)
+
+    for item in deduped:
+        writer.write((item,))
+    return f"deduped {len(items)} values to {len(deduped)}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m thefuzz", description=__doc__.split("\n\n")[0],
+                                     epilog="\n\n".join(__doc__.split("\n\n")[2:]),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--scorer", choices=SCORERS,
+                        help="(default: WRatio, token_set_ratio for dedupe)")
+    common.add_argument("--workers", type=int, default=1,
+                        help="number of threads, -1 for all cores (default: 1)")
+    common.add_argument("--delimiter", default=",", help="delimiter of CSV files (default: ,)")
+    common.add_argument("--encoding", default="utf-8", help="encoding of the files (default: utf-8)")
+    common.add_argument("--output", default="-", help="the file to write, - for stdout (default: -)")
+    common.add_argument("--output-format", choices=("csv", "tsv", "jsonl"),
+                        help="(default: from the extension of --output, csv for stdout)")
+
+    for name, summary in (("extractOne", "write the best match of every query"),
+                          ("extractBests", "write the best matches of every query")):
+        match_parser = commands.add_parser(name, help=summary, parents=[common])
+        match_parser.add_argument("queries", help="file with the queries, - for stdin")
+        match_parser.add_argument("choices", help="file with the choices")
+        match_parser.add_argument("--query-column", help="CSV column or JSON field with the queries")
+        match_parser.add_argument("--query-id", help="CSV column or JSON field with the ids of the queries")
+        match_parser.add_argument("--choice-column", help="CSV column or JSON field with the choices")
+        match_parser.add_argument("--choice-id", help="CSV column or JSON field with the ids of the choices")
+        match_parser.add_argument("--score-cutoff", type=float, default=0, help="(default: 0)")
+        if name == "extractBests":
+            match_parser.add_argument("--limit", type=int, default=5,
+                                      help="maximum number of matches per query (default: 5)")
+        match_parser.add_argument("--no-process", action="store_true",
+                                  help="match the strings as they are, without utils.full_process")
+        match_parser.add_argument("--chunk-size", type=int, default=1000,
+                                  help="number of queries matched at a time (default: 1000)")
+        match_parser.add_argument("--progress", action="store_true",
+                                  help="report the number of queries read on stderr")
+        match_parser.set_defaults(run=_match, fields=OUTPUT_FIELDS)
+
+    dedupe_parser = commands.add_parser("dedupe", help="write the values without their duplicates",
+                                        parents=[common])
+    dedupe_parser.set_defaults(run=_dedupe, fields=("value",))
+    dedupe_parser.add_argument("input", help="file with the values, - for stdin")
+    dedupe_parser.add_argument("--column", help="CSV column or JSON field with the values")
+    dedupe_parser.add_argument("--threshold", type=float, default=70, help="(default: 70)")
+    dedupe_parser.add_argument("--blocked", action="store_true",
+                               help="only compare values sharing an n-gram, see process.dedupe_blocked")
+
+    args = parser.parse_args(argv)
+
+    fmt = args.output_format or _file_format(args.output)
+    if fmt not in ("csv", "tsv", "jsonl"):
+        fmt = "csv"
+    try:
+        with contextlib.ExitStack() as stack:
+            def open_writer():
+                # called by the command once its inputs are open, so that a
+                # bad input leaves an existing output file alone
+                f = stack.enter_context(_open(args.output, args.encoding, "w"))
+                return _Writer(f, fmt, args.delimiter, args.fields)
+
+            summary = args.run(args, open_writer)
+    except BrokenPipeError:
+        # stdout was closed early, e.g. by head. Python flushes stdout again
+        # when exiting, which would fail with the same error
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    print(summary, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
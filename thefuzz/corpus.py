@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+"""
+A file format for choices that were processed ahead of time.
+
+build() writes the choices and the processed choices to a file, and Corpus
+opens it with mmap. Nothing is processed or decoded when a Corpus is opened,
+strings are decoded when they are accessed. Processes forked after opening
+a Corpus, or opening the same file, share its pages instead of each holding
+a copy. A Corpus can be passed as the choices of process.ChoiceIndex and
+its subclasses:
+
+    python -m thefuzz.corpus build titles.txt titles.corpus
+
+    index = process.ChoiceIndex(corpus.Corpus("titles.corpus"))
+
+A lookup that scores every choice decodes every processed choice again,
+which makes it slower than with a list of strings (about 0.55s instead of
+0.4s for 200,000 choices). Corpus(path, decode=True) decodes the processed
+choices a single time when it is opened, for the speed of a list at the
+cost of holding them in memory like a list would.
+
+File layout, all integers little endian:
+    8 bytes     magic, b"TFZCORP\\0"
+    4 bytes     length of the header
+    header      JSON object with the version, count, force_ascii,
+                full_process, transliterate and the sizes of the sections,
+                padded with spaces to a multiple of 8 bytes
+    (count + 1) * 8 bytes    offsets of the choices in the choice data
+    (count + 1) * 8 bytes    offsets of the processed choices, if processed
+    choice data              the choices encoded as UTF-8
+    processed data           the processed choices encoded as UTF-8, if processed
+"""
+import argparse
+import json
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+import typing as t
+from array import array
+from collections.abc import Sequence
+
+from . import process
+from . import utils
+
+MAGIC = b"TFZCORP\0"
+VERSION = 1
+
+
+class _Strings(Sequence):
+    """
+    Read-only sequence of the strings in a section of the file
+    """
+
+    def __init__(self, buf, offsets, data_start):
+        self._buf = buf
+        self._offsets = offsets
+        self._data_start = data_start
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def _get(self, i):
+        start = self._data_start + self._offsets[i]
+        end = self._data_start + self._offsets[i + 1]
+        return str(self._buf[start:end], "utf-8")
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._get(j) for j in range(*i.indices(len(self)))]
+
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("corpus index out of range")
+        return self._get(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._get(i)
+
+
+def build(
+    path: str,
+    choices: t.Iterable[str],
+    force_ascii: bool = True,
+    full_process: bool = True,
+    transliterate: bool = False,
+) -> int:
+    """
+    Process choices with utils.full_process and write them to a corpus file.
+
+    Args:
+        path: The file to write
+        choices: An iterable of strings. It is only iterated once, so it can
+            be a generator like process.read_choices().
+        force_ascii: Passed to utils.full_process. The default matches the
+            default scorer, fuzz.WRatio. Use False for fuzz.UWRatio and
+            fuzz.UQRatio, or for fuzz.ratio with the default processor.
+        full_process: Process the choices. When this is False the choices
+            are only stored, for processor=None. Defaults to True.
+        transliterate: Passed to utils.full_process, for a processor like
+            partial(utils.full_process, force_ascii=True, transliterate=True).
+            Defaults to False.
+
+    Returns: The number of choices written.
+    """
+    choice_offsets = array("Q", [0])
+    processed_offsets = array("Q", [0])
+
+    with tempfile.TemporaryFile() as choice_data, tempfile.TemporaryFile() as processed_data:
+        for choice in choices:
+            if not isinstance(choice, str):
+                raise TypeError(f"corpus choices have to be strings, got {type(choice).__name__}")
+
+            encoded = choice.encode("utf-8")
+            choice_data.write(encoded)
+            choice_offsets.append(choice_offsets[-1] + len(encoded))
+
+            if full_process:
+                encoded = utils.full_process(
+                    choice, force_ascii=force_ascii, transliterate=transliterate).encode("utf-8")
+                processed_data.write(encoded)
+                processed_offsets.append(processed_offsets[-1] + len(encoded))
+
+        if sys.byteorder != "little":
+            choice_offsets.byteswap()
+            processed_offsets.byteswap()
+
+        header = json.dumps({
+            "version": VERSION,
+            "count": len(choice_offsets) - 1,
+            "full_process": full_process,
+            "force_ascii": bool(force_ascii) if full_process else None,
+            "transliterate": bool(full_process and force_ascii and transliterate),
+            "choice_data": choice_data.tell(),
+            "processed_data": processed_data.tell(),
+        }).encode("utf-8")
+        header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)
+
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            choice_offsets.tofile(f)
+            if full_process:
+                processed_offsets.tofile(f)
+
+            for data in (choice_data, processed_data):
+                data.seek(0)
+                shutil.copyfileobj(data, f)
+
+    return len(choice_offsets) - 1
+
+
+class Corpus:
+    """
+    A corpus file written by build(), opened with mmap.
+
+    Attributes:
+        choices: Sequence of the choices
+        processed: Sequence of the processed choices. The same as choices
+            when the corpus was built with full_process=False.
+        force_ascii: force_ascii the choices were processed with, or None
+        full_process: Whether the choices were processed
+        transliterate: Whether the choices were transliterated to ASCII
+
+    Arguments:
+        path: The corpus file
+        decode: Decode the processed choices into a list when the file is
+            opened instead of on every access. Speeds up repeated lookups
+            that score all choices, but the list is not shared between
+            processes. Defaults to False.
+    """
+
+    def __init__(self, path: str, decode: bool = False):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # memoryviews of the mmap, released by close()
+        self._views = []
+        buf = self._view(memoryview(self._mmap))
+        if buf[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a corpus file")
+
+        header_size, = struct.unpack_from("<I", buf, len(MAGIC))
+        pos = len(MAGIC) + 4
+        header = json.loads(bytes(buf[pos:pos + header_size]))
+        if header["version"] != VERSION:
+            raise ValueError(f"unsupported corpus version {header['version']}")
+        pos += header_size
+
+        self.full_process = header["full_process"]
+        self.force_ascii = header["force_ascii"]
+        self.transliterate = header["transliterate"]
+
+        offsets_size = 8 * (header["count"] + 1)
+        choice_offsets = self._offsets(buf, pos, offsets_size)
+        pos += offsets_size
+        if self.full_process:
+            processed_offsets = self._offsets(buf, pos, offsets_size)
+            pos += offsets_size
+
+        self.choices = _Strings(buf, choice_offsets, pos)
+        pos += header["choice_data"]
+        self.processed = _Strings(buf, processed_offsets, pos) if self.full_process else self.choices
+        if decode:
+            self.processed = list(self.processed)
+
+    def _view(self, view):
+        self._views.append(view)
+        return view
+
+    def _offsets(self, buf, pos, size):
+        offsets = self._view(buf[pos:pos + size])
+        if sys.byteorder != "little":
+            offsets = array("Q", bytes(offsets))
+            offsets.byteswap()
+            return offsets
+        return self._view(offsets.cast("Q"))
+
+    def __len__(self):
+        return len(self.choices)
+
+    def check_processor(self, processor):
+        """
+        Raise ValueError unless processor, the processor combined by
+        process._get_processor, produces the processed choices of the corpus
+        """
+        if processor is None:
+            expected = (False, None, False)
+        else:
+            keywords = process._full_process_keywords(processor)
+            if keywords is None:
+                raise ValueError("a Corpus can only be used with utils.full_process or processor=None")
+            force_ascii, transliterate = keywords
+            expected = (True, force_ascii, force_ascii and transliterate)
+
+        if expected != (self.full_process, self.force_ascii, self.transliterate):
+            raise ValueError(
+                f"the corpus was built with full_process={self.full_process}, force_ascii={self.force_ascii}, "
+                f"transliterate={self.transliterate}, but the processor and scorer require "
+                f"full_process={expected[0]}, force_ascii={expected[1]}, transliterate={expected[2]}")
+
+    def close(self):
+        while self._views:
+            self._views.pop().release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m thefuzz.corpus", description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="build a corpus file from a newline-delimited file")
+    build_parser.add_argument("input", help="newline-delimited choices, - for stdin")
+    build_parser.add_argument("output", help="the corpus file to write")
+    build_parser.add_argument("--encoding", default="utf-8", help="encoding of the input (default: utf-8)")
+    build_parser.add_argument("--no-force-ascii", dest="force_ascii", action="store_false",
+                              help="keep non-ASCII characters, e.g. for fuzz.UWRatio")
+    build_parser.add_argument("--transliterate", action="store_true",
+                              help="transliterate instead of removing non-ASCII characters")
+    build_parser.add_argument("--no-process", dest="full_process", action="store_false",
+                              help="store the choices without processing them, for processor=None")
+
+    args = parser.parse_args(argv)
+
+    if args.input == "-":
+        choices = (line.rstrip("\r\n") for line in sys.stdin)
+    else:
+        choices = process.read_choices(args.input, encoding=args.encoding)
+
+    count = build(args.output, choices, force_ascii=args.force_ascii, full_process=args.full_process,
+                  transliterate=args.transliterate)
+    print(f"wrote {count} choices to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+"""
+Fuzzy matching over pandas Series and DataFrames, and pyarrow arrays.
+
+The columns are converted to lists once, and the choices are processed a
+single time instead of for every row, unlike calling process.extractOne()
+from DataFrame.apply(). Requires pandas.
+"""
+import typing as t
+
+from rapidfuzz import process as rprocess
+
+from . import process
+from .process import _Processor, _Scorer, default_processor, default_scorer
+
+
+def _import_pandas():
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError("thefuzz.dataframe requires pandas, install it with: pip install pandas") from None
+    return pandas
+
+
+def _to_list(values):
+    """
+    The values of a Series, pyarrow array or iterable as a list, with None
+    for missing values
+    """
+    if hasattr(values, "to_pylist"):  # pyarrow.Array and ChunkedArray
+        return values.to_pylist()
+    if hasattr(values, "notna"):  # pandas.Series
+        return values.astype(object).where(values.notna(), None).tolist()
+    return list(values)
+
+
+def _index(values):
+    return values.index if hasattr(values, "notna") else None
+
+
+def score_pairs(
+    s1,
+    s2,
+    processor: t.Optional[_Processor] = default_processor,
+    scorer: _Scorer = default_scorer,
+):
+    """
+    Score every value of s1 against the value at the same position of s2.
+
+    Args:
+        s1: A Series, pyarrow array or list of strings
+        s2: A Series, pyarrow array or list of strings of the same length
+        processor: Optional function for transforming the strings before
+            matching. See process.extract().
+        scorer: Scoring function for process.extract().
+
+    Returns: A Series of the scores, with the index of s1 if it is a Series.
+        Missing values score 0.
+    """
+    pd = _import_pandas()
+    s1_values = _to_list(s1)
+    s2_values = _to_list(s2)
+    if len(s1_values) != len(s2_values):
+        raise ValueError("s1 and s2 have to be of the same length")
+
+    processor = process._get_processor(processor, scorer)
+    s1_values = process._preprocess_choices(s1_values, processor)
+    s2_values = process._preprocess_choices(s2_values, processor)
+    rf_scorer = process._get_scorer(scorer)
+
+    # None values are scored by rapidfuzz as 0
+    if process._is_lowered(scorer) and hasattr(rprocess, "cpdist"):
+        scores = rprocess.cpdist(s1_values, s2_values, scorer=rf_scorer, processor=None).round()
+    else:
+        scores = [0 if a is None or b is None else rf_scorer(a, b) for a, b in zip(s1_values, s2_values)]
+        if process._is_lowered(scorer):
+            scores = [int(round(score)) for score in scores]
+
+    return pd.Series(scores, index=_index(s1), dtype="int64" if process._is_lowered(scorer) else None)
+
+
+def extract_one(
+    queries,
+    choices,
+    processor: t.Optional[_Processor] = default_processor,
+    scorer: _Scorer = default_scorer,
+    score_cutoff: t.Optional[float] = 0,
+):
+    """
+    process.extractOne() for every query, with the choices processed once.
+
+    Args:
+        queries: A Series, pyarrow array or list of strings to look up
+        choices: A Series, pyarrow array or list of strings, or a
+            process.ChoiceIndex. The key of a match is the index label for
+            a Series, the key of the choice for a ChoiceIndex of a mapping
+            and the position otherwise.
+        processor: Optional function for transforming the strings before
+            matching. See process.extract().
+        scorer: Scoring function for process.extract().
+        score_cutoff: Optional argument for score threshold. Queries without
+            a match of at least this score get missing values.
+
+    Returns: A DataFrame with the columns match, score and key, and the index
+        of queries if it is a Series.
+    """
+    pd = _import_pandas()
+    index = _choice_index(choices, processor, scorer)
+    labels = _index(choices)
+
+    rows = [(None, None, None)] * len(queries)
+    for left, query in enumerate(_to_list(queries)):
+        if query is None:
+            continue
+
+        # positions instead of keys, which need not be unique for a ChoiceIndex of a Series
+        results = index._extract(index._process_query(query), score_cutoff, 1)
+        if not results:
+            continue
+
+        right, score = results[0]
+        if index._is_lowered:
+            score = int(round(score))
+        if index._is_mapping:
+            key = index._keys[right]
+        else:
+            key = right if labels is None else labels[right]
+        rows[left] = (index._choices[right], score, key)
+
+    return pd.DataFrame(rows, columns=["match", "score", "key"], index=_index(queries))
+
+
+def _choice_index(choices, processor, scorer):
+    if isinstance(choices, process.ChoiceIndex):
+        return choices
+    return process.ChoiceIndex(_to_list(choices), processor=processor, scorer=scorer)
+
+
+def fuzzy_merge(
+    left,
+    right,
+    left_on: str,
+    right_on: str,
+    processor: t.Optional[_Processor] = default_processor,
+    scorer: _Scorer = default_scorer,
+    score_cutoff: t.Optional[float] = 0,
+    limit: t.Optional[int] = 1,
+    how: str = "inner",
+    score_column: str = "score",
+    suffixes: t.Tuple[str, str] = ("_x", "_y"),
+    workers: int = 1,
+):
+    """
+    Merge two DataFrames on the best fuzzy matches of two string columns.
+
+    Args:
+        left: DataFrame with the records to look up
+        right: DataFrame with the records to link them to. Its column is
+            processed a single time.
+        left_on: The column of left to match
+        right_on: The column of right to match against
+        processor: Optional function for transforming the strings before
+            matching. See process.extract().
+        scorer: Scoring function for process.extract(), e.g.
+            fuzz.token_sort_ratio. Defaults to fuzz.WRatio.
+        score_cutoff: Optional argument for score threshold. Defaults to 0.
+        limit: The maximum number of matches for every row of left.
+            Defaults to 1.
+        how: "inner" keeps the rows of left with a match, "left" keeps all
+            rows of left with missing values for the columns of right.
+            Defaults to "inner".
+        score_column: The name of the column with the score. Defaults to
+            "score".
+        suffixes: Suffixes added to the names of columns in both left and
+            right, like for DataFrame.merge. Defaults to ("_x", "_y").
+        workers: The number of threads. See process.match_lists().
+
+    Returns: A DataFrame with the columns of left, right and score_column,
+        in the order of left and then of the score, with a new index.
+    """
+    pd = _import_pandas()
+    if how not in ("inner", "left"):
+        raise ValueError(f"how has to be 'inner' or 'left', got {how!r}")
+
+    index = _choice_index(right[right_on], processor, scorer)
+    links = list(process.match_lists(_to_list(left[left_on]), index, score_cutoff=score_cutoff,
+                                     limit=limit, workers=workers))
+    if how == "left":
+        matched = {position for position, _, _ in links}
+        links.extend((position, None, None) for position in range(len(left)) if position not in matched)
+        # stable, so the matches of a row stay ordered by score
+        links.sort(key=lambda link: link[0])
+
+    overlap = set(left.columns) & set(right.columns)
+    left_part = left.rename(columns={c: f"{c}{suffixes[0]}" for c in overlap})
+    right_part = right.rename(columns={c: f"{c}{suffixes[1]}" for c in overlap})
+
+    left_part = left_part.iloc[[position for position, _, _ in links]].reset_index(drop=True)
+    # reindexing with -1 adds a row of missing values for rows of left without a match
+    right_part = right_part.reset_index(drop=True).reindex(
+        [-1 if position is None else position for _, position, _ in links]).reset_index(drop=True)
+
+    result = pd.concat([left_part, right_part], axis=1)
+    result[score_column] = [score for _, _, score in links]
+    return result
@@ -1,5 +1,9 @@
 #!/usr/bin/env python
 
+from array import array
+from functools import partial
+import time
+
 from rapidfuzz.fuzz import (
     ratio as _ratio,
     partial_ratio as _partial_ratio,
@@ -11,8 +15,30 @@ from rapidfuzz.fuzz import (
     QRatio as _QRatio,
 )
 
+from rapidfuzz.process import extract as _extract
+
+from . import instrument
 from . import utils
 
+_score_cache = None
+
+
+def set_score_cache(cache):
+    """
+    Look up the scores of the scoring functions in cache before calculating
+    them. The cache is keyed on the scorer and the processed strings, so
+    the U* variants share entries with the scorers they call.
+
+    :param cache: a utils.ScoreCache, or None to disable caching
+    """
+    global _score_cache
+    _score_cache = cache
+
+
+def get_score_cache():
+    return _score_cache
+
+
 ###########################
 # Basic Scoring Functions #
 ###########################
@@ -22,6 +48,9 @@ def _rapidfuzz_scorer(scorer, s1, s2, force_ascii, full_process):
     """
     wrapper around rapidfuzz function to be compatible with the API of thefuzz
     """
+    if instrument._hook is not None:
+        return _instrumented_scorer(scorer, s1, s2, force_ascii, full_process)
+
     if full_process:
         if s1 is None or s2 is None:
             return 0
@@ -29,9 +58,105 @@ def _rapidfuzz_scorer(scorer, s1, s2, force_ascii, full_process):
         s1 = utils.full_process(s1, force_ascii=force_ascii)
         s2 = utils.full_process(s2, force_ascii=force_ascii)
 
+    return _score(scorer, s1, s2)
+
+
+def _score(scorer, s1, s2):
+    cache = _score_cache
+    if cache is not None and isinstance(s1, str) and isinstance(s2, str):
+        key = cache.make_key(scorer.__name__, s1, s2)
+        score = cache.get(key)
+        if score is None:
+            score = int(round(scorer(s1, s2)))
+            cache.set(key, score)
+        return score
+
     return int(round(scorer(s1, s2)))
 
 
+def _instrumented_scorer(scorer, s1, s2, force_ascii, full_process):
+    """
+    _rapidfuzz_scorer, reporting a CallStats to the instrumentation hook
+    """
+    stats = instrument.CallStats("fuzz." + scorer.__name__)
+    stats.choices = 1
+
+    score = 0
+    start = time.perf_counter()
+    if full_process and s1 is not None and s2 is not None:
+        s1 = utils.full_process(s1, force_ascii=force_ascii)
+        s2 = utils.full_process(s2, force_ascii=force_ascii)
+    processed = time.perf_counter()
+    stats.processing_time = processed - start
+
+    if not full_process or (s1 is not None and s2 is not None):
+        cache = _score_cache
+        hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+        score = _score(scorer, s1, s2)
+        stats.scoring_time = time.perf_counter() - processed
+        if cache is not None:
+            stats.cache_hits = cache.hits - hits
+            stats.cache_misses = cache.misses - misses
+
+    instrument._hook(stats)
+    return score
+
+
+def _rapidfuzz_scorer_many(scorer, query, choices, force_ascii, full_process):
+    """
+    one-to-many version of _rapidfuzz_scorer. The query is only processed once
+    and the choices are scored inside of rapidfuzz.
+    """
+    if instrument._hook is not None:
+        return _instrumented_scorer_many(scorer, query, choices, force_ascii, full_process)
+
+    choices = choices if isinstance(choices, (list, tuple)) else list(choices)
+    scores = array("B", bytes(len(choices)))
+
+    processor = None
+    if full_process:
+        if query is None:
+            return scores
+
+        processor = partial(utils.full_process, force_ascii=force_ascii)
+
+    results = _extract(query, choices, scorer=scorer, processor=processor,
+                       score_cutoff=0, limit=None)
+    for _, score, index in results:
+        scores[index] = int(round(score))
+
+    return scores
+
+
+def _instrumented_scorer_many(scorer, query, choices, force_ascii, full_process):
+    """
+    _rapidfuzz_scorer_many, reporting a CallStats to the instrumentation hook.
+    The strings are processed up front, so processing and scoring can be
+    timed separately.
+    """
+    stats = instrument.CallStats("fuzz." + scorer.__name__ + "_many")
+    choices = choices if isinstance(choices, (list, tuple)) else list(choices)
+    scores = array("B", bytes(len(choices)))
+    stats.choices = len(choices) - choices.count(None)
+
+    start = time.perf_counter()
+    if full_process and query is not None:
+        query = utils.full_process(query, force_ascii=force_ascii)
+        choices = [None if choice is None else utils.full_process(choice, force_ascii=force_ascii)
+                   for choice in choices]
+    processed = time.perf_counter()
+    stats.processing_time = processed - start
+
+    if not full_process or query is not None:
+        results = _extract(query, choices, scorer=scorer, processor=None, score_cutoff=0, limit=None)
+        for _, score, index in results:
+            scores[index] = int(round(score))
+        stats.scoring_time = time.perf_counter() - processed
+
+    instrument._hook(stats)
+    return scores
+
+
 def ratio(s1, s2):
     return _rapidfuzz_scorer(_ratio, s1, s2, False, False)
 
@@ -158,3 +283,55 @@ def UWRatio(s1, s2, full_process=True):
     using different algorithms. Same as WRatio but preserving unicode.
     """
     return WRatio(s1, s2, force_ascii=False, full_process=full_process)
+
+
+###################
+# One-to-many API #
+###################
+
+# Scores of one query against a sequence of choices, as an array('B') with
+# the same scores the functions above return for every pair. None choices
+# score 0.
+
+def ratio_many(query, choices):
+    return _rapidfuzz_scorer_many(_ratio, query, choices, False, False)
+
+
+def partial_ratio_many(query, choices):
+    return _rapidfuzz_scorer_many(_partial_ratio, query, choices, False, False)
+
+
+def token_sort_ratio_many(query, choices, force_ascii=True, full_process=True):
+    return _rapidfuzz_scorer_many(_token_sort_ratio, query, choices, force_ascii, full_process)
+
+
+def partial_token_sort_ratio_many(query, choices, force_ascii=True, full_process=True):
+    return _rapidfuzz_scorer_many(
+        _partial_token_sort_ratio, query, choices, force_ascii, full_process
+    )
+
+
+def token_set_ratio_many(query, choices, force_ascii=True, full_process=True):
+    return _rapidfuzz_scorer_many(_token_set_ratio, query, choices, force_ascii, full_process)
+
+
+def partial_token_set_ratio_many(query, choices, force_ascii=True, full_process=True):
+    return _rapidfuzz_scorer_many(
+        _partial_token_set_ratio, query, choices, force_ascii, full_process
+    )
+
+
+def QRatio_many(query, choices, force_ascii=True, full_process=True):
+    return _rapidfuzz_scorer_many(_QRatio, query, choices, force_ascii, full_process)
+
+
+def UQRatio_many(query, choices, full_process=True):
+    return QRatio_many(query, choices, force_ascii=False, full_process=full_process)
+
+
+def WRatio_many(query, choices, force_ascii=True, full_process=True):
+    return _rapidfuzz_scorer_many(_WRatio, query, choices, force_ascii, full_process)
+
+
+def UWRatio_many(query, choices, full_process=True):
+    return WRatio_many(query, choices, force_ascii=False, full_process=full_process)
@@ -1,3 +1,8 @@
+from array import array
+from typing import Iterable, Optional
+
+from .utils import ScoreCache
+
 def ratio(s1: str, s2: str) -> int: ...
 def partial_ratio(s1: str, s2: str) -> int: ...
 def token_sort_ratio(s1: str, s2: str, force_ascii: bool = ..., full_process: bool = ...) -> int: ...
@@ -8,3 +13,15 @@ def QRatio(s1: str, s2: str, force_ascii: bool = ..., full_process: bool = ...)
 def UQRatio(s1: str, s2: str, full_process: bool = ...) -> int: ...
 def WRatio(s1: str, s2: str, force_ascii: bool = ..., full_process: bool = ...) -> int: ...
 def UWRatio(s1: str, s2: str, full_process: bool = ...) -> int: ...
+def set_score_cache(cache: Optional[ScoreCache]) -> None: ...
+def get_score_cache() -> Optional[ScoreCache]: ...
+def ratio_many(query: str, choices: Iterable[Optional[str]]) -> array[int]: ...
+def partial_ratio_many(query: str, choices: Iterable[Optional[str]]) -> array[int]: ...
+def token_sort_ratio_many(query: str, choices: Iterable[Optional[str]], force_ascii: bool = ..., full_process: bool = ...) -> array[int]: ...
+def partial_token_sort_ratio_many(query: str, choices: Iterable[Optional[str]], force_ascii: bool = ..., full_process: bool = ...) -> array[int]: ...
+def token_set_ratio_many(query: str, choices: Iterable[Optional[str]], force_ascii: bool = ..., full_process: bool = ...) -> array[int]: ...
+def partial_token_set_ratio_many(query: str, choices: Iterable[Optional[str]], force_ascii: bool = ..., full_process: bool = ...) -> array[int]: ...
+def QRatio_many(query: str, choices: Iterable[Optional[str]], force_ascii: bool = ..., full_process: bool = ...) -> array[int]: ...
+def UQRatio_many(query: str, choices: Iterable[Optional[str]], full_process: bool = ...) -> array[int]: ...
+def WRatio_many(query: str, choices: Iterable[Optional[str]], force_ascii: bool = ..., full_process: bool = ...) -> array[int]: ...
+def UWRatio_many(query: str, choices: Iterable[Optional[str]], full_process: bool = ...) -> array[int]: ...
@@ -0,0 +1,596 @@
+#!/usr/bin/env python
+"""
+Subclasses of process.ChoiceIndex that only score the choices which can
+match the query, instead of scanning every choice.
+"""
+import random
+import typing as t
+import zlib
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain
+
+from rapidfuzz import fuzz as rfuzz
+from rapidfuzz.distance import Indel
+
+from . import fuzz
+from . import process
+
+try:
+    import numpy as np
+except ImportError:  # the signatures are computed in Python instead
+    np = None
+from .process import (
+    ChoiceIndex, _Choices, _ChoicesMap, _Processor, _Scorer, _T,
+    default_processor, default_scorer,
+)
+
+
+class TokenIndex(ChoiceIndex):
+    """
+    A ChoiceIndex with an inverted index from tokens to choices.
+
+    Only choices sharing at least one token with the query are scored, using
+    the scorer of the index. Choices without any shared token are treated
+    like choices scoring below score_cutoff, so this trades some recall for
+    speed. Use ngram_size to share character n-grams of the tokens instead,
+    which also finds choices with misspelled tokens.
+
+    Arguments:
+        choices: An iterable or dictionary-like object containing choices.
+            See process.extract().
+        processor: Optional function for transforming choices before matching.
+            See process.extract().
+        scorer: Scoring function for process.extract().
+        ngram_size: Optional length of the character n-grams of the tokens
+            used as index keys. Defaults to None (whole tokens).
+        full_scan: Score every choice like ChoiceIndex does, e.g. for lookups
+            where recall matters. Can be changed on the index. Defaults to False.
+        fallback: Score every choice when the query shares no token with any
+            choice. Defaults to True. Every choice is also scored when more
+            than half of the choices share a token with the query, which is
+            faster than scoring them by position.
+        max_postings: Optional maximum number of choices for a token. More
+            common tokens (e.g. "the" or "vs") are ignored when looking up
+            candidates. Without it a query with such a token usually
+            scores every choice, see fallback. A limit of a few percent of
+            the choices keeps those lookups fast, but misses the choices
+            only sharing common tokens with the query. Defaults to None
+            (no limit).
+    """
+
+    def __init__(
+        self,
+        choices: t.Union[_ChoicesMap[_T], _Choices],
+        processor: t.Optional[_Processor] = default_processor,
+        scorer: _Scorer = default_scorer,
+        ngram_size: t.Optional[int] = None,
+        full_scan: bool = False,
+        fallback: bool = True,
+        max_postings: t.Optional[int] = None,
+    ):
+        super().__init__(choices, processor=processor, scorer=scorer)
+        self.ngram_size = ngram_size
+        self.full_scan = full_scan
+        self.fallback = fallback
+        self.max_postings = max_postings
+
+        self._postings = {}
+        for index, processed in enumerate(self._processed):
+            if processed is not None:
+                self._index_choice(index, processed)
+
+    def _index_keys(self, processed):
+        if self.ngram_size is None:
+            return set(processed.split())
+        return process._ngram_keys(processed, self.ngram_size)
+
+    def _index_choice(self, position, processed):
+        for key in self._index_keys(processed):
+            postings = self._postings.setdefault(key, [])
+            if not postings or postings[-1] < position:
+                postings.append(position)
+            else:
+                insort(postings, position)
+
+    def _unindex_choice(self, position, processed):
+        for key in self._index_keys(processed):
+            postings = self._postings[key]
+            postings.remove(position)
+            if not postings:
+                del self._postings[key]
+
+    def _candidates(self, processed_query, score_cutoff):
+        if self.full_scan or processed_query is None:
+            return None
+
+        postings = [self._postings.get(key, ()) for key in self._index_keys(processed_query)]
+        if self.max_postings is not None:
+            postings = [p for p in postings if len(p) <= self.max_postings]
+
+        # scanning the list of choices is faster than scoring most of them
+        # by position, like for LengthIndex
+        half = len(self._processed) // 2
+        if any(len(p) > half for p in postings):
+            return None
+
+        candidates = set(chain.from_iterable(postings))
+        if not candidates and self.fallback or len(candidates) > half:
+            return None
+        return sorted(candidates)
+
+
+def _ratio_lengths(length, score_cutoff):
+    # ratio is at most 200 * min(l1, l2) / (l1 + l2)
+    if length == 0:
+        return 0, 0
+    return score_cutoff * length / (200 - score_cutoff), length * (200 - score_cutoff) / score_cutoff
+
+
+def _qratio_lengths(length, score_cutoff):
+    # like ratio, but empty strings score 0
+    if length == 0:
+        return None
+    low, high = _ratio_lengths(length, score_cutoff)
+    return max(low, 1), high
+
+
+def _wratio_lengths(length, score_cutoff):
+    # the token ratios are scaled by 0.95, and only used while the length
+    # ratio is below 1.5. Above it the partial ratios are scaled by 0.9 up
+    # to a length ratio of 8 and by 0.6 beyond that
+    if length == 0:
+        return None
+    if score_cutoff > 95:
+        return _ratio_lengths(length, score_cutoff)
+    if score_cutoff > 90:
+        return length / 1.5, length * 1.5
+    if score_cutoff > 60:
+        return length / 8, length * 8
+    return 1, float("inf")
+
+
+# (processed query length, score_cutoff) -> the range of processed choice
+# lengths that can reach score_cutoff, or None when none can
+_length_bounds = {
+    rfuzz.ratio: _ratio_lengths,
+    rfuzz.QRatio: _qratio_lengths,
+    rfuzz.WRatio: _wratio_lengths,
+}
+
+
+class LengthIndex(ChoiceIndex):
+    """
+    A ChoiceIndex grouping the choices by the length of the processed choice.
+
+    With a score_cutoff only the choices with a length that can reach
+    score_cutoff are scored, e.g. for ratio and a score_cutoff of 90 the
+    lengths of the processed query and choice can differ by about 20% at
+    most. The results are the same as for ChoiceIndex. This works for
+    fuzz.ratio, fuzz.QRatio, fuzz.WRatio and their U* variants, other scorers
+    score every choice.
+
+    Arguments:
+        choices: An iterable or dictionary-like object containing choices.
+            See process.extract().
+        processor: Optional function for transforming choices before matching.
+            See process.extract().
+        scorer: Scoring function for process.extract().
+    """
+
+    def __init__(
+        self,
+        choices: t.Union[_ChoicesMap[_T], _Choices],
+        processor: t.Optional[_Processor] = default_processor,
+        scorer: _Scorer = default_scorer,
+    ):
+        super().__init__(choices, processor=processor, scorer=scorer)
+        self._bounds = _length_bounds.get(self._scorer) if self._is_lowered else None
+
+        # length -> positions of the choices, and the sorted lengths
+        self._buckets = {}
+        self._lengths = []
+        for index, processed in enumerate(self._processed):
+            if processed is not None:
+                self._index_choice(index, processed)
+
+    def _index_choice(self, position, processed):
+        bucket = self._buckets.get(len(processed))
+        if bucket is None:
+            bucket = self._buckets[len(processed)] = []
+            insort(self._lengths, len(processed))
+
+        if not bucket or bucket[-1] < position:
+            bucket.append(position)
+        else:
+            insort(bucket, position)
+
+    def _unindex_choice(self, position, processed):
+        bucket = self._buckets[len(processed)]
+        bucket.remove(position)
+        if not bucket:
+            del self._buckets[len(processed)]
+            del self._lengths[bisect_left(self._lengths, len(processed))]
+
+    def _candidates(self, processed_query, score_cutoff):
+        if self._bounds is None or not score_cutoff or processed_query is None:
+            return None
+
+        bounds = self._bounds(len(processed_query), score_cutoff)
+        if bounds is None:
+            return []
+
+        # widened a little, so float rounding can not drop a choice
+        low, high = bounds
+        start = bisect_left(self._lengths, low * (1 - 1e-9))
+        end = bisect_right(self._lengths, high * (1 + 1e-9))
+        buckets = [self._buckets[length] for length in self._lengths[start:end]]
+
+        # scanning the list of choices is faster than scoring most of them
+        # by position
+        if 2 * sum(len(bucket) for bucket in buckets) > len(self._processed):
+            return None
+
+        return sorted(chain.from_iterable(buckets))
+
+
+def _ratio_distance(length, score_cutoff):
+    # ratio is 100 * (1 - distance / (l1 + l2)), and the choice length l2 is
+    # at most l1 * (200 - score_cutoff) / score_cutoff (see _ratio_lengths)
+    return 2 * length * (100 - score_cutoff) / score_cutoff
+
+
+def _qratio_distance(length, score_cutoff):
+    # like ratio, but empty strings score 0
+    if length == 0:
+        return None
+    return _ratio_distance(length, score_cutoff)
+
+
+# (processed query length, score_cutoff) -> the largest Indel distance of a
+# processed choice that can reach score_cutoff, or None when none can
+_max_distances = {
+    rfuzz.ratio: _ratio_distance,
+    rfuzz.QRatio: _qratio_distance,
+}
+
+
+class BKTreeIndex(ChoiceIndex):
+    """
+    A ChoiceIndex with a BK-tree of the processed choices, a metric tree on
+    their Indel distance.
+
+    fuzz.ratio and fuzz.QRatio are computed from the Indel distance, so a
+    score_cutoff bounds the distance of the choices that can reach it, e.g.
+    2 for a processed query of 9 characters and a score_cutoff of 90. Only
+    the subtrees that can contain such choices are searched, and only the
+    choices within the distance are scored. The results are the same as for
+    ChoiceIndex. This works for fuzz.ratio, fuzz.QRatio and fuzz.UQRatio,
+    other scorers score every choice.
+
+    The smaller the distance, the fewer nodes are visited. For larger
+    distances most of the tree is visited, which is slower than scoring every
+    choice, so lookups for a distance above max_distance score every choice
+    instead. The distance grows with the length of the query: with the
+    default max_distance of 2 the tree is only used for processed queries of
+    up to 13 characters at a score_cutoff of 90, and up to 28 characters at
+    a score_cutoff of 95. Longer queries fall back to scoring every choice,
+    so this suits short strings like names, codes or single words.
+
+    Removed choices leave their nodes in the tree. Once half of the nodes
+    have no choices left, the tree is rebuilt from the remaining ones.
+
+    Arguments:
+        choices: An iterable or dictionary-like object containing choices.
+            See process.extract().
+        processor: Optional function for transforming choices before matching.
+            See process.extract().
+        scorer: Scoring function for process.extract().
+        max_distance: The largest distance the tree is searched for. Can be
+            changed on the index, a larger value can pay off for millions of
+            choices. Defaults to 2.
+    """
+
+    def __init__(
+        self,
+        choices: t.Union[_ChoicesMap[_T], _Choices],
+        processor: t.Optional[_Processor] = default_processor,
+        scorer: _Scorer = default_scorer,
+        max_distance: int = 2,
+    ):
+        super().__init__(choices, processor=processor, scorer=scorer)
+        self._distance_bound = _max_distances.get(self._scorer) if self._is_lowered else None
+        self.max_distance = max_distance
+
+        # a node is [processed choice, positions of the choices, {distance: child node}].
+        # Equal processed choices share a node, which is kept when its choices are
+        # removed, until _dead_nodes reaches half of the nodes
+        self._root = None
+        self._nodes = {}
+        self._dead_nodes = 0
+        for index, processed in enumerate(self._processed):
+            if processed is not None:
+                self._index_choice(index, processed)
+
+    def _index_choice(self, position, processed):
+        node = self._nodes.get(processed)
+        if node is None:
+            self._insert(processed, [position])
+            return
+
+        positions = node[1]
+        if not positions:
+            self._dead_nodes -= 1
+        if not positions or positions[-1] < position:
+            positions.append(position)
+        else:
+            insort(positions, position)
+
+    def _insert(self, processed, positions):
+        new_node = self._nodes[processed] = [processed, positions, {}]
+        node = self._root
+        if node is None:
+            self._root = new_node
+            return
+
+        while True:
+            distance = Indel.distance(processed, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = new_node
+                return
+            node = child
+
+    def _unindex_choice(self, position, processed):
+        positions = self._nodes[processed][1]
+        positions.remove(position)
+        if not positions:
+            self._dead_nodes += 1
+            if 2 * self._dead_nodes >= len(self._nodes):
+                self._rebuild()
+
+    def _rebuild(self):
+        """
+        Build the tree again from the nodes that still have choices
+        """
+        live = [node for node in self._nodes.values() if node[1]]
+        self._root = None
+        self._nodes = {}
+        self._dead_nodes = 0
+        for processed, positions, _ in live:
+            self._insert(processed, positions)
+
+    def _candidates(self, processed_query, score_cutoff):
+        if self._distance_bound is None or not score_cutoff or processed_query is None:
+            return None
+
+        bound = self._distance_bound(len(processed_query), score_cutoff)
+        if bound is None or self._root is None:
+            return []
+
+        # widened a little, so float rounding can not drop a choice
+        radius = int(bound * (1 + 1e-9))
+        if radius > self.max_distance:
+            return None
+        distance = Indel.distance
+        candidates = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            d = distance(processed_query, node[0])
+            if d <= radius:
+                candidates.extend(node[1])
+
+            # by the triangle inequality, the choices within radius of the
+            # query are in the children at a distance of d +- radius
+            children = node[2]
+            if children:
+                for child_distance in range(max(d - radius, 1), d + radius + 1):
+                    child = children.get(child_distance)
+                    if child is not None:
+                        stack.append(child)
+
+        candidates.sort()
+        return candidates
+
+
+_MERSENNE_PRIME = (1 << 31) - 1
+
+# number of choices hashed at a time by numpy, which bounds the memory
+# used to num_perm * 8 bytes per token of the batch
+_BATCH_SIZE = 10000
+
+
+class MinHashIndex(ChoiceIndex):
+    """
+    A ChoiceIndex finding the choices with similar token sets by locality
+    sensitive hashing (LSH) of MinHash signatures.
+
+    The signature of a processed choice is the minimum of num_perm hash
+    functions over its tokens. Two token sets agree on every value with a
+    probability equal to their Jaccard similarity j (the number of shared
+    tokens over the number of distinct tokens). The signature is split into
+    bands of num_perm / bands rows, and only the choices agreeing with the
+    query on all rows of at least one band are scored with the scorer of the
+    index. A choice is scored with a probability of
+    1 - (1 - j ** rows) ** bands, which is an S-curve around
+    (1 / bands) ** (1 / rows), 0.25 for the defaults. More bands or
+    fewer rows find more of the matches at the cost of scoring more choices.
+    Pass threshold instead of bands to choose them from the Jaccard
+    similarity the matches are expected to have: the fewest bands with the
+    most rows finding a choice with that similarity with a probability of at
+    least recall.
+
+    The bands are fixed when the index is built, they do not follow the
+    score_cutoff of a query. This suits fuzz.token_sort_ratio, and
+    fuzz.token_set_ratio on texts where the overlap of the tokens dominates
+    the score, with a high score_cutoff. fuzz.token_set_ratio also scores
+    100 when the tokens of one string are a subset of the tokens of the
+    other, so a query of 3 tokens scores 100 against a title of 12 tokens
+    containing them, with a Jaccard similarity of 0.25. Such matches are
+    only found reliably if threshold is at most their Jaccard similarity,
+    use a TokenIndex to look up short phrases in long choices. Choices
+    without a similar token set are treated like choices scoring below
+    score_cutoff, so this trades some recall for speed. An empty index can
+    also be passed to process.Deduper to find the candidates of dedupe.
+
+    Building the index computes num_perm hashes per token of every choice.
+    With numpy installed the choices passed to the constructor are hashed
+    in batches, which takes about 3s for 100,000 titles with the
+    defaults. Without numpy, and for choices added later, the hashes are
+    computed in Python, about 12s for the same titles.
+
+    Arguments:
+        choices: An iterable or dictionary-like object containing choices.
+            See process.extract().
+        processor: Optional function for transforming choices before matching.
+            See process.extract().
+        scorer: Scoring function for process.extract(). Defaults to
+            fuzz.token_set_ratio.
+        num_perm: The number of hash functions. Defaults to 32.
+        bands: The number of bands, num_perm has to be a multiple of it.
+            Defaults to 16.
+        seed: Seed of the hash functions. Defaults to 1.
+        threshold: Optional Jaccard similarity (0, 1] of the token sets of
+            the matches. If given, bands is ignored and the bands and rows
+            are derived from threshold and recall, using at most num_perm
+            hash functions. With too few hash functions for recall, every
+            band has a single row.
+        recall: The probability of finding a choice with a Jaccard
+            similarity of threshold. Defaults to 0.95.
+    """
+
+    def __init__(
+        self,
+        choices: t.Union[_ChoicesMap[_T], _Choices],
+        processor: t.Optional[_Processor] = default_processor,
+        scorer: _Scorer = fuzz.token_set_ratio,
+        num_perm: int = 32,
+        bands: int = 16,
+        seed: int = 1,
+        threshold: t.Optional[float] = None,
+        recall: float = 0.95,
+    ):
+        if threshold is not None:
+            if not 0 < threshold <= 1 or not 0 < recall < 1:
+                raise ValueError("threshold has to be in (0, 1] and recall in (0, 1)")
+            bands, num_perm = self._derive_bands(num_perm, threshold, recall)
+        elif bands < 1 or num_perm % bands:
+            raise ValueError("num_perm has to be a multiple of bands")
+
+        super().__init__(choices, processor=processor, scorer=scorer)
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # the hash functions (a * h + b) mod p of universal hashing
+        rng = random.Random(seed)
+        self._permutations = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(_MERSENNE_PRIME))
+                              for _ in range(num_perm)]
+
+        # band -> values of the rows of the band -> positions of the choices
+        self._buckets = [{} for _ in range(bands)]
+        if np is None:
+            for index, processed in enumerate(self._processed):
+                if processed is not None:
+                    self._index_choice(index, processed)
+        else:
+            for start in range(0, len(self._processed), _BATCH_SIZE):
+                batch = self._processed[start:start + _BATCH_SIZE]
+                for index, keys in enumerate(self._batch_band_keys(batch), start):
+                    if keys is not None:
+                        self._add_keys(index, keys)
+
+    @staticmethod
+    def _derive_bands(num_perm, threshold, recall):
+        """
+        The bands and the number of hash functions used for them, with the
+        most rows per band finding a choice with a Jaccard similarity of
+        threshold with a probability of at least recall
+        """
+        for rows in range(num_perm, 1, -1):
+            bands = num_perm // rows
+            if 1 - (1 - threshold ** rows) ** bands >= recall:
+                return bands, bands * rows
+        return num_perm, num_perm
+
+    @staticmethod
+    def _token_hashes(processed):
+        # crc32 instead of hash(), which differs between processes
+        return {zlib.crc32(token.encode("utf-8")) for token in processed.split()}
+
+    def _split_bands(self, signature):
+        rows = self.rows
+        return [tuple(signature[i:i + rows]) for i in range(0, len(signature), rows)]
+
+    def _band_keys(self, processed):
+        """
+        The values of the rows of every band, or None for choices without tokens
+        """
+        hashes = self._token_hashes(processed)
+        if not hashes:
+            return None
+
+        # the minimum of every hash function, computed for all functions per
+        # token and then per function, which is faster than the other way around
+        signature = list(map(min, zip(*[[(a * h + b) % _MERSENNE_PRIME for a, b in self._permutations]
+                                        for h in hashes])))
+        return self._split_bands(signature)
+
+    def _batch_band_keys(self, processed_choices):
+        """
+        _band_keys of every processed choice, None for None, computed with numpy
+        """
+        hashes = [() if processed is None else self._token_hashes(processed) for processed in processed_choices]
+        counts = np.fromiter(map(len, hashes), dtype=np.int64, count=len(hashes))
+        results = [None] * len(hashes)
+        if not counts.any():
+            return results
+
+        # a < p and h < 2 ** 32, so a * h + b < 2 ** 63 does not overflow
+        a, b = np.array(self._permutations, dtype=np.uint64).T
+        flat = np.fromiter(chain.from_iterable(hashes), dtype=np.uint64, count=int(counts.sum()))
+        values = (flat[:, None] * a + b) % np.uint64(_MERSENNE_PRIME)
+
+        # the minimum over the tokens of every choice with tokens
+        has_tokens = counts > 0
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[has_tokens]
+        signatures = np.minimum.reduceat(values, starts, axis=0).tolist()
+        for index, signature in zip(np.flatnonzero(has_tokens).tolist(), signatures):
+            results[index] = self._split_bands(signature)
+        return results
+
+    def _index_choice(self, position, processed):
+        keys = self._band_keys(processed)
+        if keys is not None:
+            self._add_keys(position, keys)
+
+    def _add_keys(self, position, keys):
+        for buckets, key in zip(self._buckets, keys):
+            bucket = buckets.setdefault(key, [])
+            if not bucket or bucket[-1] < position:
+                bucket.append(position)
+            else:
+                insort(bucket, position)
+
+    def _unindex_choice(self, position, processed):
+        keys = self._band_keys(processed)
+        if keys is None:
+            return
+
+        for buckets, key in zip(self._buckets, keys):
+            bucket = buckets[key]
+            bucket.remove(position)
+            if not bucket:
+                del buckets[key]
+
+    def _candidates(self, processed_query, score_cutoff):
+        if processed_query is None:
+            return None
+
+        keys = self._band_keys(processed_query)
+        if keys is None:
+            return []
+
+        candidates = set()
+        for buckets, key in zip(self._buckets, keys):
+            candidates.update(buckets.get(key, ()))
+        return sorted(candidates)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Opt-in instrumentation of the process functions and the fuzz scorers.
+
+A hook registered with set_hook() is called with a CallStats after every
+call of an instrumented function, e.g. to export the numbers to a metrics
+system. Without a hook the functions only check whether one is set, and
+nothing is counted or timed.
+
+Instrumented functions:
+    process.extractWithoutOrder, extract, extractBests, extractOne, dedupe,
+    ChoiceIndex.extractWithoutOrder, extract, extractBests and extractOne,
+    and the fuzz scorers including their _many variants.
+
+Scorers called by the process functions report their own calls as well,
+this only happens for scorers that are not lowered to rapidfuzz (see
+process.extractWithoutOrder).
+"""
+import threading
+import typing as t
+
+_hook = None
+
+
+class CallStats:
+    """
+    Numbers for a single call of an instrumented function
+
+    Attributes:
+        function: Name of the function, e.g. "process.extractBests"
+        choices: The number of choices that were considered, not counting
+            None. 1 for a call of a scorer comparing two strings
+        matches: The number of results of the process functions
+        pruned: The number of choices that were not scored, because an
+            index or adaptive_cutoff ruled them out
+        processing_time: Seconds spent in processing the query and choices
+        scoring_time: Seconds spent in scoring
+        cache_hits: Hits of the score cache (see fuzz.set_score_cache)
+        cache_misses: Misses of the score cache
+    """
+
+    __slots__ = ("function", "choices", "matches", "pruned", "processing_time",
+                 "scoring_time", "cache_hits", "cache_misses")
+
+    def __init__(self, function: str):
+        self.function = function
+        self.choices = 0
+        self.matches = 0
+        self.pruned = 0
+        self.processing_time = 0.0
+        self.scoring_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"CallStats({fields})"
+
+
+def set_hook(hook: t.Optional[t.Callable[[CallStats], None]]):
+    """
+    Call hook with a CallStats after every call of an instrumented function.
+
+    :param hook: a callable taking a CallStats, or None to disable
+        instrumentation
+    """
+    global _hook
+    _hook = hook
+
+
+def get_hook() -> t.Optional[t.Callable[[CallStats], None]]:
+    return _hook
+
+
+class Collector:
+    """
+    A hook adding up the CallStats of every call per function.
+
+    Attributes:
+        totals: Mapping of the function name to a CallStats with the sums
+        calls: Mapping of the function name to the number of calls
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, stats: CallStats):
+        with self._lock:
+            total = self.totals.get(stats.function)
+            if total is None:
+                total = self.totals[stats.function] = CallStats(stats.function)
+                self.calls[stats.function] = 0
+
+            self.calls[stats.function] += 1
+            for name in CallStats.__slots__[1:]:
+                setattr(total, name, getattr(total, name) + getattr(stats, name))
+
+    def clear(self):
+        with self._lock:
+            self.totals.clear()
+            self.calls.clear()
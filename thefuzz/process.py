@@ -1,11 +1,22 @@
 #!/usr/bin/env python
 from . import fuzz
+from . import instrument
 from . import utils
 import logging
 import typing as t
 from rapidfuzz import fuzz as rfuzz
 from rapidfuzz import process as rprocess
 from functools import partial
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import collections
+import heapq
+import inspect
+import itertools
+import os
+import pickle
+import sys
+import time
 
 _T = t.TypeVar("_T")
 _Processor = t.Callable[[str], str]
@@ -21,24 +32,48 @@ default_scorer = fuzz.WRatio
 default_processor = utils.full_process
 
 
+# utils.full_process for both values of force_ascii, created once instead of per call
+_pre_processors = {
+    force_ascii: partial(utils.full_process, force_ascii=force_ascii)
+    for force_ascii in (False, True)
+}
+
+
+def _full_process_keywords(processor):
+    """
+    (force_ascii, transliterate) of utils.full_process or of a partial of it
+    with keyword arguments only, None for any other processor
+    """
+    if processor is utils.full_process:
+        return (False, False)
+    if isinstance(processor, partial) and processor.func is utils.full_process and not processor.args:
+        return (bool(processor.keywords.get("force_ascii", False)),
+                bool(processor.keywords.get("transliterate", False)))
+    return None
+
+
 def _get_processor(processor, scorer):
     """
     thefuzz runs both the default preprocessing of the function and the preprocessing
     function passed into process.* while rapidfuzz only runs the one passed into
     process.*. This function wraps the processor to mimic this behavior
     """
-    if scorer not in (fuzz.WRatio, fuzz.QRatio,
-                      fuzz.token_set_ratio, fuzz.token_sort_ratio,
-                      fuzz.partial_token_set_ratio, fuzz.partial_token_sort_ratio,
-                      fuzz.UWRatio, fuzz.UQRatio):
+    lowered = _lower_scorer(scorer)
+    if lowered is None or not lowered[2]:
         return processor
 
-    force_ascii = scorer not in [fuzz.UWRatio, fuzz.UQRatio]
-    pre_processor = partial(utils.full_process, force_ascii=force_ascii)
+    pre_processor = _pre_processors[bool(lowered[1])]
 
     if not processor or processor == utils.full_process:
         return pre_processor
 
+    if _full_process_keywords(processor) == (True, True):
+        # the results of partial(utils.full_process, force_ascii=True, transliterate=True)
+        # are processed ASCII strings, which pre_processor returns unchanged. This
+        # does not hold for full_process in general, e.g. "\u0178" lowercases to
+        # "\u00ff", which a second pass with force_ascii=True removes
+        return processor
+
     def wrapper(s):
         return pre_processor(processor(s))
 
@@ -64,25 +99,198 @@ _scorer_lowering = {
     fuzz.UQRatio: rfuzz.QRatio,
 }
 
+# default (force_ascii, full_process) of the lowered scorers and the keyword
+# arguments they accept, so functools.partial objects setting them can be lowered
+_scorer_options = {
+    fuzz.ratio: (False, False, frozenset()),
+    fuzz.partial_ratio: (False, False, frozenset()),
+    fuzz.token_set_ratio: (True, True, frozenset({"force_ascii", "full_process"})),
+    fuzz.token_sort_ratio: (True, True, frozenset({"force_ascii", "full_process"})),
+    fuzz.partial_token_set_ratio: (True, True, frozenset({"force_ascii", "full_process"})),
+    fuzz.partial_token_sort_ratio: (True, True, frozenset({"force_ascii", "full_process"})),
+    fuzz.WRatio: (True, True, frozenset({"force_ascii", "full_process"})),
+    fuzz.QRatio: (True, True, frozenset({"force_ascii", "full_process"})),
+    fuzz.UWRatio: (False, True, frozenset({"full_process"})),
+    fuzz.UQRatio: (False, True, frozenset({"full_process"})),
+}
+
+
+def _lower_scorer(scorer):
+    """
+    Returns (rapidfuzz scorer, force_ascii, full_process) for the scorers in
+    _scorer_lowering and for functools.partial objects of them, which only set
+    force_ascii and/or full_process. Returns None for any other scorer
+    """
+    keywords = {}
+    if isinstance(scorer, partial) and not scorer.args:
+        keywords = scorer.keywords
+        scorer = scorer.func
+
+    rf_scorer = _scorer_lowering.get(scorer)
+    if rf_scorer is None:
+        return None
+
+    force_ascii, full_process, accepted = _scorer_options[scorer]
+    if not accepted.issuperset(keywords):
+        return None
+
+    return (rf_scorer,
+            keywords.get("force_ascii", force_ascii),
+            keywords.get("full_process", full_process))
+
+
+def _is_lowered(scorer):
+    return _lower_scorer(scorer) is not None
+
+
+def _accepts_score_cutoff(scorer):
+    try:
+        return "score_cutoff" in inspect.signature(scorer).parameters
+    except (TypeError, ValueError):
+        return False
+
 
 def _get_scorer(scorer):
     """
     rapidfuzz scorers require the score_cutoff argument to be available
-    This generates a compatible wrapper function
+    This generates a compatible wrapper function, unless the scorer already
+    accepts score_cutoff
     """
+    lowered = _lower_scorer(scorer)
+    if lowered is not None:
+        return lowered[0]
+
+    if _accepts_score_cutoff(scorer):
+        return scorer
+
     def wrapper(s1, s2, score_cutoff=0):
         return scorer(s1, s2)
 
-    return _scorer_lowering.get(scorer, wrapper)
+    return wrapper
+
+
+# the empty query warning is logged at most once per query in this interval,
+# so high-QPS callers repeating a bad query do not flood the log
+_EMPTY_QUERY_WARNING_INTERVAL = 60
+_empty_query_warnings = {}
+
+
+def _warn_empty_query(query):
+    now = time.monotonic()
+    key = str(query)
+    last = _empty_query_warnings.get(key)
+    if last is not None and now - last < _EMPTY_QUERY_WARNING_INTERVAL:
+        return
+
+    if len(_empty_query_warnings) >= 1024:
+        _empty_query_warnings.clear()
+    _empty_query_warnings[key] = now
+
+    _logger.warning("Applied processor reduces input query to empty string, "
+                    "all comparisons will have score 0. "
+                    f"[Query: \'{query}\']")
+
+
+def _preprocess_query(query, processor):
+    """
+    Processes the query once for process.*, so rapidfuzz can be called with
+    processor=None. Warns when the processor reduces the query to an empty string
+    """
+    if not processor:
+        return query
+
+    processed_query = processor(query)
+    if len(processed_query) == 0:
+        _warn_empty_query(query)
+
+    return processed_query
+
+
+def _process_choices(choices, processor):
+    """
+    Returns the choices in an indexable form, their keys (None for choices
+    that are not a mapping) and the processed choices, all by position, so
+    results of rapidfuzz can be mapped back to the choices. The keys of a
+    mapping like a pandas Series do not have to be unique.
+    """
+    keys = None
+    if hasattr(choices, "items"):
+        items = list(choices.items())
+        keys = [key for key, _ in items]
+        choices = [choice for _, choice in items]
+    elif not isinstance(choices, (list, tuple)) and not isinstance(choices, t.Sequence):
+        choices = list(choices)
+
+    if not processor:
+        return choices, keys, choices
+    return choices, keys, _preprocess_choices(choices, processor)
+
+
+def _extract_shard(processed_query, choices, processor, scorer, score_cutoff, limit):
+    """
+    Runs in a worker of _extract_parallel, so it only returns scores and indices
+    """
+    results = rprocess.extract(
+        processed_query, _preprocess_choices(choices, _get_processor(processor, scorer)),
+        processor=None,
+        scorer=_get_scorer(scorer),
+        score_cutoff=score_cutoff,
+        limit=limit
+    )
+    return [(score, index) for _, score, index in results]
 
 
-def _validate_query_preprocessing(query, processor):
-    if processor:
-        processed_query = processor(query)
-        if len(processed_query) == 0:
-            _logger.warning("Applied processor reduces input query to empty string, "
-                            "all comparisons will have score 0. "
-                            f"[Query: \'{query}\']")
+def _get_executor(processor, scorer, workers):
+    """
+    lowered scorers release the GIL inside of rapidfuzz, so they can run in threads.
+    Other scorers run in Python and are sent to worker processes instead, as long
+    as they can be pickled.
+    """
+    if not _is_lowered(scorer):
+        try:
+            pickle.dumps((processor, scorer))
+        except (pickle.PicklingError, AttributeError, TypeError):
+            pass
+        else:
+            return ProcessPoolExecutor(workers)
+
+    return ThreadPoolExecutor(workers)
+
+
+def _extract_parallel(processed_query, choices, processor, scorer, score_cutoff, limit, workers):
+    """
+    Shards the choices across workers and merges the results of every shard,
+    ordered by score and then by position of the choice like rprocess.extract
+    """
+    if workers < 1:
+        workers = os.cpu_count() or 1
+
+    if hasattr(choices, "items"):
+        items = list(choices.items())
+        keys = [key for key, _ in items]
+        choices = [choice for _, choice in items]
+    else:
+        choices = list(choices)
+        keys = range(len(choices))
+
+    shard_size = max(1, -(-len(choices) // workers))
+    offsets = range(0, len(choices), shard_size)
+
+    with _get_executor(processor, scorer, workers) as executor:
+        futures = [
+            executor.submit(_extract_shard, processed_query, choices[offset:offset + shard_size],
+                            processor, scorer, score_cutoff, limit)
+            for offset in offsets
+        ]
+        scores = [(score, offset + index)
+                  for offset, future in zip(offsets, futures)
+                  for score, index in future.result()]
+
+    scores.sort(key=lambda x: (-x[0], x[1]))
+    if limit is not None:
+        scores = scores[:limit]
+
+    return [(choices[index], score, keys[index]) for score, index in scores]
 
 
 @t.overload
@@ -142,6 +350,13 @@ def extractWithoutOrder(
 
             By default, fuzz.WRatio() is used and expects both query and
             choice to be strings.
+
+            The scorers in thefuzz.fuzz, and functools.partial objects of
+            them that set force_ascii or full_process, are run natively by
+            rapidfuzz. Other scorers can accept a score_cutoff keyword
+            argument, f(query, choice, score_cutoff) -> int. They may return
+            early with any score below score_cutoff once the choice can not
+            reach it, since those choices are not returned.
         score_cutoff: Optional argument for score threshold. No matches with
             a score less than this number will be returned. Defaults to 0.
 
@@ -161,21 +376,46 @@ def extractWithoutOrder(
         ('train', 22, 'bard'), ('man', 0, 'dog')
     """
     is_mapping = hasattr(choices, "items")
-    is_lowered = scorer in _scorer_lowering
-
-    _validate_query_preprocessing(query, processor)
-    it = rprocess.extract_iter(
-        query, choices,
-        processor=_get_processor(processor, scorer),
-        scorer=_get_scorer(scorer),
-        score_cutoff=score_cutoff
-    )
-
-    for choice, score, key in it:
-        if is_lowered:
-            score = int(round(score))
-
-        yield (choice, score, key) if is_mapping else (choice, score)
+    is_lowered = _is_lowered(scorer)
+    call_stats = instrument.CallStats("process.extractWithoutOrder") if instrument._hook is not None else None
+
+    if call_stats is not None:
+        start = time.perf_counter()
+    processor = _get_processor(processor, scorer)
+    rf_scorer = _get_scorer(scorer)
+    processed_query = _preprocess_query(query, processor)
+
+    try:
+        for chunk in _iter_chunks(choices, 1000):
+            if call_stats is not None:
+                start = start or time.perf_counter()
+            processed_choices = _preprocess_choices([choice for _, choice in chunk], processor)
+            it = rprocess.extract_iter(
+                processed_query, processed_choices,
+                processor=None,
+                scorer=rf_scorer,
+                score_cutoff=score_cutoff
+            )
+
+            if call_stats is not None:
+                scoring = time.perf_counter()
+                it = list(it)
+                call_stats.processing_time += scoring - start
+                call_stats.scoring_time += time.perf_counter() - scoring
+                call_stats.choices += len(processed_choices) - processed_choices.count(None)
+                call_stats.matches += len(it)
+                start = None
+
+            for _, score, index in it:
+                key, choice = chunk[index]
+                if is_lowered:
+                    score = int(round(score))
+
+                yield (choice, score, key) if is_mapping else (choice, score)
+    finally:
+        # also when the generator is closed before it is exhausted
+        if call_stats is not None:
+            instrument._hook(call_stats)
 
 
 @t.overload
@@ -185,6 +425,9 @@ def extract(
     processor: t.Optional[_Processor] = ...,
     scorer: _Scorer = ...,
     limit: t.Optional[float] = ...,
+    workers: int = ...,
+    adaptive_cutoff: bool = ...,
+    stats: t.Optional["ExtractStats"] = ...,
 ) -> t.List[_MappedResult[_T]]:
     ...
 
@@ -196,6 +439,9 @@ def extract(
     processor: t.Optional[_Processor] = ...,
     scorer: _Scorer = ...,
     limit: t.Optional[float] = ...,
+    workers: int = ...,
+    adaptive_cutoff: bool = ...,
+    stats: t.Optional["ExtractStats"] = ...,
 ) -> t.List[_Result]:
     ...
 
@@ -206,6 +452,9 @@ def extract(
     processor: t.Optional[_Processor] = default_processor,
     scorer: _Scorer = default_scorer,
     limit: t.Optional[float] = 5,
+    workers: int = 1,
+    adaptive_cutoff: bool = False,
+    stats: t.Optional["ExtractStats"] = None,
 ) -> t.Union[t.List[_MappedResult[_T]], t.List[_Result]]:
     """
     Select the best match in a list or dictionary of choices.
@@ -233,9 +482,20 @@ def extract(
             an individual processed choice. This should be a function
             of the form f(query, choice) -> int.
             By default, fuzz.WRatio() is used and expects both query and
-            choice to be strings.
+            choice to be strings. See extractWithoutOrder() for scorers
+            accepting score_cutoff.
         limit: Optional maximum for the number of elements returned. Defaults
             to 5.
+        workers: The number of workers the choices are split across. Built-in
+            scorers run in threads, other scorers in processes when they can be
+            pickled. -1 uses all available cores. Defaults to 1.
+        adaptive_cutoff: Raise score_cutoff to the score of the worst match
+            found so far once limit matches are found, so the scorer can
+            reject the remaining choices early. The results are the same.
+            Requires workers=1. Defaults to False.
+        stats: Optional ExtractStats, which the number of choices and of
+            choices pruned by adaptive_cutoff are added to. Only used with
+            adaptive_cutoff.
 
     Returns:
         List of tuples containing the match and its score.
@@ -252,7 +512,8 @@ def extract(
 
         [('train', 22, 'bard'), ('man', 0, 'dog')]
     """
-    return extractBests(query, choices, processor=processor, scorer=scorer, limit=limit)
+    return extractBests(query, choices, processor=processor, scorer=scorer, limit=limit, workers=workers,
+                        adaptive_cutoff=adaptive_cutoff, stats=stats)
 
 
 @t.overload
@@ -263,6 +524,9 @@ def extractBests(
     scorer: _Scorer = ...,
     score_cutoff: t.Optional[float] = ...,
     limit: t.Optional[float] = ...,
+    workers: int = ...,
+    adaptive_cutoff: bool = ...,
+    stats: t.Optional["ExtractStats"] = ...,
 ) -> t.List[_MappedResult[_T]]:
     ...
 
@@ -275,6 +539,9 @@ def extractBests(
     scorer: _Scorer = ...,
     score_cutoff: t.Optional[float] = ...,
     limit: t.Optional[int] = ...,
+    workers: int = ...,
+    adaptive_cutoff: bool = ...,
+    stats: t.Optional["ExtractStats"] = ...,
 ) -> t.List[_Result]:
     ...
 
@@ -286,11 +553,17 @@ def extractBests(
     scorer: _Scorer = default_scorer,
     score_cutoff: t.Optional[float] = 0,
     limit: t.Optional[float] = 5,
+    workers: int = 1,
+    adaptive_cutoff: bool = False,
+    stats: t.Optional["ExtractStats"] = None,
 ) -> t.Union[t.List[_MappedResult[_T]], t.List[_Result]]:
     """
     Get a list of the best matches to a collection of choices.
 
-    Convenience function for getting the choices with best scores.
+    Convenience function for getting the choices with best scores. The
+    choices are processed into a copy before they are scored, which holds
+    every processed choice in memory at once. Use extractWithoutOrder() or
+    extract_stream() for choices that should not all be held in memory.
 
     Args:
         query: A string to match against
@@ -303,20 +576,86 @@ def extractBests(
             a score less than this number will be returned. Defaults to 0.
         limit: Optional maximum for the number of elements returned. Defaults
             to 5.
+        workers: The number of workers the choices are split across.
+            See extract(). Defaults to 1.
+        adaptive_cutoff: Raise score_cutoff while scoring. See extract().
+            Defaults to False.
+        stats: Optional ExtractStats. See extract().
 
     Returns: A a list of (match, score) tuples.
     """
-    is_mapping = hasattr(choices, "items")
-    is_lowered = scorer in _scorer_lowering
+    if adaptive_cutoff and workers != 1:
+        raise ValueError("adaptive_cutoff requires workers=1")
 
-    _validate_query_preprocessing(query, processor)
-    results = rprocess.extract(
-        query, choices,
-        processor=_get_processor(processor, scorer),
-        scorer=_get_scorer(scorer),
-        score_cutoff=score_cutoff,
-        limit=limit
-    )
+    if instrument._hook is None:
+        return _extract_bests(query, choices, processor, scorer, score_cutoff, limit, workers,
+                              adaptive_cutoff, stats, None)
+
+    call_stats = instrument.CallStats("process.extractBests")
+    results = _extract_bests(query, choices, processor, scorer, score_cutoff, limit, workers,
+                             adaptive_cutoff, stats, call_stats)
+    instrument._hook(call_stats)
+    return results
+
+
+def _count_choices(choices):
+    """
+    The number of choices that are not None, for the instrumentation
+    """
+    values = [choice for _, choice in choices.items()] if hasattr(choices, "items") else choices
+    return len(values) - values.count(None)
+
+
+def _extract_bests(query, choices, processor, scorer, score_cutoff, limit, workers,
+                   adaptive_cutoff, stats, call_stats):
+    """
+    extractBests(), adding the numbers of the call to call_stats when it is
+    not None
+    """
+    is_mapping = hasattr(choices, "items")
+    is_lowered = _is_lowered(scorer)
+
+    if call_stats is not None:
+        start = time.perf_counter()
+    query_processor = _get_processor(processor, scorer)
+    processed_query = _preprocess_query(query, query_processor)
+    if workers != 1:
+        if call_stats is not None:
+            # the choices are processed in the workers, so all of it counts as scoring
+            choices = choices if is_mapping else list(choices)
+            call_stats.choices += _count_choices(choices)
+            scoring = start
+        results = _extract_parallel(processed_query, choices, processor, scorer, score_cutoff, limit, workers)
+    else:
+        choices, keys, processed_choices = _process_choices(choices, query_processor)
+        if call_stats is not None:
+            scoring = time.perf_counter()
+            call_stats.processing_time += scoring - start
+            call_stats.choices += _count_choices(processed_choices)
+            if adaptive_cutoff and stats is None:
+                stats = ExtractStats()
+            pruned = stats.pruned if adaptive_cutoff else 0
+
+        if adaptive_cutoff:
+            results = _extract_adaptive(processed_query, processed_choices, _get_scorer(scorer),
+                                        score_cutoff, limit, is_lowered, stats)
+        else:
+            results = rprocess.extract(
+                processed_query, processed_choices,
+                processor=None,
+                scorer=_get_scorer(scorer),
+                score_cutoff=score_cutoff,
+                limit=limit
+            )
+        results = [(choices[index], score, index if keys is None else keys[index])
+                   for _, score, index in results]
+
+        if call_stats is not None and adaptive_cutoff:
+            call_stats.pruned += stats.pruned - pruned
+
+    if call_stats is not None:
+        call_stats.scoring_time += time.perf_counter() - scoring
+        call_stats.matches += len(results)
 
     for i, (choice, score, key) in enumerate(results):
         if is_lowered:
@@ -334,6 +673,7 @@ def extractOne(
     procprocessor: t.Optional[_Processor] = ...,
     scorer: _Scorer = ...,
     score_cutoff: t.Optional[float] = ...,
+    workers: int = ...,
 ) -> t.Optional[_MappedResult[_T]]:
     ...
 
@@ -345,6 +685,7 @@ def extractOne(
     procprocessor: t.Optional[_Processor] = ...,
     scorer: _Scorer = ...,
     score_cutoff: t.Optional[float] = ...,
+    workers: int = ...,
 ) -> t.Optional[_Result]:
     ...
 
@@ -355,12 +696,16 @@ def extractOne(
     processor: t.Optional[_Processor] = default_processor,
     scorer: _Scorer = default_scorer,
     score_cutoff: t.Optional[float] = 0,
+    workers: int = 1,
 ) -> t.Optional[t.Union[_MappedResult[_T], _Result]]:
     """
     Find the single best match above a score in a list of choices.
 
     This is a convenience method which returns the single best choice.
-    See extract() for the full arguments list.
+    See extract() for the full arguments list. The choices are processed
+    into a copy before they are scored, so the query is processed exactly
+    once. The copy holds every processed choice in memory at once, use
+    extract_stream() for choices that should not all be held in memory.
 
     Args:
         query: A string to match against
@@ -372,21 +717,40 @@ def extractOne(
         score_cutoff: Optional argument for score threshold. If the best
             match is found, but it is not greater than this number, then
             return None anyway ("not a good enough match").  Defaults to 0.
+        workers: The number of workers the choices are split across.
+            See extract(). Defaults to 1.
 
     Returns:
         A tuple containing a single match and its score, if a match
         was found that was above score_cutoff. Otherwise, returns None.
     """
-    is_mapping = hasattr(choices, "items")
-    is_lowered = scorer in _scorer_lowering
+    if instrument._hook is not None:
+        # rprocess.extract with limit=1 finds the same match as rprocess.extractOne
+        call_stats = instrument.CallStats("process.extractOne")
+        results = _extract_bests(query, choices, processor, scorer, score_cutoff, 1, workers,
+                                 False, None, call_stats)
+        instrument._hook(call_stats)
+        return results[0] if results else None
 
-    _validate_query_preprocessing(query, processor)
-    res = rprocess.extractOne(
-        query, choices,
-        processor=_get_processor(processor, scorer),
-        scorer=_get_scorer(scorer),
-        score_cutoff=score_cutoff
-    )
+    is_mapping = hasattr(choices, "items")
+    is_lowered = _is_lowered(scorer)
+
+    query_processor = _get_processor(processor, scorer)
+    processed_query = _preprocess_query(query, query_processor)
+    if workers != 1:
+        res = _extract_parallel(processed_query, choices, processor, scorer, score_cutoff, 1, workers)
+        res = res[0] if res else None
+    else:
+        choices, keys, processed_choices = _process_choices(choices, query_processor)
+        res = rprocess.extractOne(
+            processed_query, processed_choices,
+            processor=None,
+            scorer=_get_scorer(scorer),
+            score_cutoff=score_cutoff
+        )
+        if res is not None:
+            _, score, index = res
+            res = (choices[index], score, index if keys is None else keys[index])
 
     if res is None:
         return res
@@ -399,6 +763,731 @@ def extractOne(
     return (choice, score, key) if is_mapping else (choice, score)
 
 
+def _is_none(choice):
+    """
+    Whether rapidfuzz skips the choice: None, NaN or pandas.NA, the missing
+    values of a pandas Series
+    """
+    if choice is None:
+        return True
+    if isinstance(choice, str):
+        return False
+    if isinstance(choice, float):
+        return choice != choice
+    pandas = sys.modules.get("pandas")
+    return pandas is not None and choice is pandas.NA
+
+
+def _preprocess_choices(choices, processor):
+    """
+    Run the processor over every choice once, so the processed choices can be
+    reused for several queries. Missing choices are None, since rapidfuzz skips them.
+    """
+    if not processor:
+        return list(choices)
+    # strings are checked first, so _is_none is only called for other choices
+    return [processor(choice) if isinstance(choice, str) or not _is_none(choice) else None
+            for choice in choices]
+
+
+class ChoiceIndex:
+    """
+    A collection of choices that are processed a single time and can then be
+    searched repeatedly.
+
+    The extract methods behave like the module level functions of the same
+    name, called with the choices, processor and scorer given here. Choices
+    can be added, removed and updated without processing the other choices
+    again. The index is not thread-safe, lookups must not run while it is
+    being changed.
+
+    Arguments:
+        choices: An iterable or dictionary-like object containing choices.
+            See extract(). This can also be a corpus.Corpus, whose processed
+            choices are used as they are. Its processing has to match the
+            processor and scorer. The strings of a Corpus are decoded on
+            every access, so lookups are slower than with a list unless it
+            was opened with decode=True.
+        processor: Optional function for transforming choices before matching.
+            See extract().
+        scorer: Scoring function for extract().
+    """
+
+    def __init__(
+        self,
+        choices: t.Union[_ChoicesMap[_T], _Choices],
+        processor: t.Optional[_Processor] = default_processor,
+        scorer: _Scorer = default_scorer,
+    ):
+        self._is_mapping = hasattr(choices, "items")
+        self._is_lowered = _is_lowered(scorer)
+        self._processor = _get_processor(processor, scorer)
+        self._scorer = _get_scorer(scorer)
+        # key -> position for indexes of dictionaries, built by the first update
+        self._positions = None
+        self._removed = 0
+
+        from .corpus import Corpus
+        if isinstance(choices, Corpus):
+            choices.check_processor(self._processor)
+            self._keys = None
+            self._choices = choices.choices
+            self._processed = choices.processed
+            return
+
+        if self._is_mapping:
+            # only items(), pandas.Series.values is a property and not a method
+            items = list(choices.items())
+            self._keys = [key for key, _ in items]
+            self._choices = [choice for _, choice in items]
+        else:
+            self._keys = None
+            self._choices = list(choices)
+
+        self._processed = _preprocess_choices(self._choices, self._processor)
+
+    def __len__(self):
+        return len(self._choices) - self._removed
+
+    def _make_mutable(self):
+        if not isinstance(self._processed, list):  # a corpus.Corpus
+            self._choices = list(self._choices)
+            self._processed = list(self._processed)
+        if self._is_mapping and self._positions is None:
+            self._positions = {key: position for position, key in enumerate(self._keys)}
+
+    def _position(self, key):
+        self._make_mutable()
+        if self._is_mapping:
+            return self._positions[key]
+
+        if not isinstance(key, int) or not 0 <= key < len(self._choices) or self._choices[key] is None:
+            raise KeyError(key)
+        return key
+
+    def _set(self, position, choice, processed=None):
+        """
+        Replace the choice at position, processing only this choice unless
+        it was processed already
+        """
+        old = self._processed[position]
+        if old is not None:
+            self._unindex_choice(position, old)
+
+        if choice is None:
+            processed = None
+        elif processed is None:
+            processed = self._processor(choice) if self._processor else choice
+
+        self._choices[position] = choice
+        self._processed[position] = processed
+        if processed is not None:
+            self._index_choice(position, processed)
+
+    def _index_choice(self, position, processed):
+        """
+        Called for every choice that is added to the index. Subclasses
+        override this and _unindex_choice to keep their lookup structures
+        up to date.
+        """
+
+    def _unindex_choice(self, position, processed):
+        """
+        Called for every choice that is removed or replaced
+        """
+
+    def add(self, choice: str, key: t.Any = None) -> t.Any:
+        """
+        Add a choice to the index, processing only this choice.
+
+        For an index of a dictionary the key of the choice is required, and
+        a choice that already has this key is replaced like by update(). For
+        an index of a list the choice is appended, and its position is the
+        key for remove() and update().
+
+        Returns: The key of the choice
+        """
+        return self._add(choice, key)
+
+    def _add(self, choice, key=None, processed=None):
+        """
+        add(), for a choice of an index of a list that was processed with the
+        processor of the index already, when processed is not None
+        """
+        self._make_mutable()
+        if self._is_mapping:
+            if key is None:
+                raise TypeError("adding to an index of a dictionary requires a key")
+            if key in self._positions:
+                self.update(key, choice)
+                return key
+
+            position = self._positions[key] = len(self._choices)
+            self._keys.append(key)
+        elif key is not None:
+            raise TypeError("the keys of an index of a list are the positions of the choices")
+        else:
+            position = key = len(self._choices)
+
+        self._choices.append(None)
+        self._processed.append(None)
+        self._set(position, choice, processed)
+        return key
+
+    def remove(self, key: t.Any) -> None:
+        """
+        Remove the choice with the key, or at the position for an index of a
+        list. The positions of the other choices do not change. Raises
+        KeyError if there is no such choice.
+        """
+        position = self._position(key)
+        self._set(position, None)
+        self._removed += 1
+        if self._is_mapping:
+            del self._positions[key]
+
+    def update(self, key: t.Any, choice: str) -> None:
+        """
+        Replace the choice with the key, or at the position for an index of a
+        list, e.g. after a rename. Raises KeyError if there is no such choice.
+        """
+        if choice is None:
+            raise TypeError("use remove() to remove a choice")
+        self._set(self._position(key), choice)
+
+    def _process_query(self, query):
+        return _preprocess_query(query, self._processor)
+
+    def _candidates(self, processed_query, score_cutoff):
+        """
+        Sorted positions of the choices that have to be scored for the query,
+        or None to score every choice. Subclasses override this to skip choices
+        that can not reach score_cutoff.
+        """
+        return None
+
+    def _targets(self, processed_query, score_cutoff):
+        """
+        The processed choices passed to rapidfuzz. Results are keyed by position.
+        """
+        candidates = self._candidates(processed_query, score_cutoff)
+        if candidates is None:
+            return self._processed
+
+        processed = self._processed
+        return {index: processed[index] for index in candidates}
+
+    def _extract(self, processed_query, score_cutoff, limit):
+        """
+        (position, score) of the best matches, with the unrounded scores
+        """
+        results = rprocess.extract(
+            processed_query, self._targets(processed_query, score_cutoff),
+            processor=None,
+            scorer=self._scorer,
+            score_cutoff=score_cutoff,
+            limit=limit
+        )
+        return [(index, score) for _, score, index in results]
+
+    def _instrumented_extract(self, function, query, score_cutoff, limit, ordered=True):
+        """
+        _extract for the query, reporting a CallStats for function to the
+        instrumentation hook. With ordered=False the matches are in the order
+        of the choices, like for extractWithoutOrder
+        """
+        call_stats = instrument.CallStats("process.ChoiceIndex." + function)
+        start = time.perf_counter()
+        processed_query = self._process_query(query)
+        scoring = time.perf_counter()
+
+        targets = self._targets(processed_query, score_cutoff)
+        if ordered:
+            results = rprocess.extract(processed_query, targets, processor=None, scorer=self._scorer,
+                                       score_cutoff=score_cutoff, limit=limit)
+        else:
+            results = list(rprocess.extract_iter(processed_query, targets, processor=None, scorer=self._scorer,
+                                                 score_cutoff=score_cutoff))
+
+        call_stats.processing_time = scoring - start
+        call_stats.scoring_time = time.perf_counter() - scoring
+        # removed choices are None
+        call_stats.choices = _count_choices(targets)
+        call_stats.pruned = _count_choices(self._processed) - call_stats.choices
+        call_stats.matches = len(results)
+        instrument._hook(call_stats)
+
+        return [(index, score) for _, score, index in results]
+
+    def _make_result(self, index, score):
+        if self._is_lowered:
+            score = int(round(score))
+
+        choice = self._choices[index]
+        return (choice, score, self._keys[index]) if self._is_mapping else (choice, score)
+
+    def extractWithoutOrder(
+        self,
+        query: str,
+        score_cutoff: t.Optional[float] = 0,
+    ) -> t.Union[t.Iterator[_MappedResult[_T]], t.Iterator[_Result]]:
+        """
+        Generator of all choices with a score of at least score_cutoff.
+        See extractWithoutOrder().
+        """
+        if instrument._hook is not None:
+            for index, score in self._instrumented_extract("extractWithoutOrder", query, score_cutoff, None,
+                                                           ordered=False):
+                yield self._make_result(index, score)
+            return
+
+        processed_query = self._process_query(query)
+        it = rprocess.extract_iter(
+            processed_query, self._targets(processed_query, score_cutoff),
+            processor=None,
+            scorer=self._scorer,
+            score_cutoff=score_cutoff
+        )
+
+        for _, score, index in it:
+            yield self._make_result(index, score)
+
+    def extract(
+        self,
+        query: str,
+        limit: t.Optional[int] = 5,
+    ) -> t.Union[t.List[_MappedResult[_T]], t.List[_Result]]:
+        """
+        List of the best matches for the query. See extract().
+        """
+        return self.extractBests(query, limit=limit)
+
+    def extractBests(
+        self,
+        query: str,
+        score_cutoff: t.Optional[float] = 0,
+        limit: t.Optional[int] = 5,
+    ) -> t.Union[t.List[_MappedResult[_T]], t.List[_Result]]:
+        """
+        List of the best matches with a score of at least score_cutoff.
+        See extractBests().
+        """
+        if instrument._hook is not None:
+            results = self._instrumented_extract("extractBests", query, score_cutoff, limit)
+        else:
+            results = self._extract(self._process_query(query), score_cutoff, limit)
+        return [self._make_result(index, score) for index, score in results]
+
+    def extractOne(
+        self,
+        query: str,
+        score_cutoff: t.Optional[float] = 0,
+    ) -> t.Optional[t.Union[_MappedResult[_T], _Result]]:
+        """
+        The single best match with a score of at least score_cutoff, or None.
+        See extractOne().
+        """
+        if instrument._hook is not None:
+            results = self._instrumented_extract("extractOne", query, score_cutoff, 1)
+            return self._make_result(*results[0]) if results else None
+
+        processed_query = self._process_query(query)
+        res = rprocess.extractOne(
+            processed_query, self._targets(processed_query, score_cutoff),
+            processor=None,
+            scorer=self._scorer,
+            score_cutoff=score_cutoff
+        )
+
+        if res is None:
+            return res
+
+        _, score, index = res
+        return self._make_result(index, score)
+
+
+def extract_many(
+    queries: t.Iterable[str],
+    choices: t.Union[_ChoicesMap[_T], _Choices],
+    processor: t.Optional[_Processor] = default_processor,
+    scorer: _Scorer = default_scorer,
+    score_cutoff: t.Optional[float] = 0,
+    limit: t.Optional[int] = 5,
+) -> t.Union[t.List[t.List[_MappedResult[_T]]], t.List[t.List[_Result]]]:
+    """
+    Get a list of the best matches in a collection of choices for every query.
+
+    This returns the same results as calling extractBests() once per query,
+    but the choices are only processed a single time.
+
+    Args:
+        queries: An iterable of strings to match against
+        choices: A list or dictionary of choices, suitable for use with
+            extract().
+        processor: Optional function for transforming choices before matching.
+            See extract().
+        scorer: Scoring function for extract().
+        score_cutoff: Optional argument for score threshold. No matches with
+            a score less than this number will be returned. Defaults to 0.
+        limit: Optional maximum for the number of elements returned per
+            query. Defaults to 5.
+
+    Returns: A list with one list of (match, score) tuples per query.
+    """
+    index = ChoiceIndex(choices, processor=processor, scorer=scorer)
+    return [index.extractBests(query, score_cutoff=score_cutoff, limit=limit)
+            for query in queries]
+
+
+def _match_chunk(index, chunk, score_cutoff, limit):
+    """
+    The (left_key, right_key, score) results of match_lists for a chunk of
+    (left_key, record) pairs from _iter_chunks
+    """
+    results = []
+    for left_key, record in chunk:
+        if record is None:
+            continue
+
+        for position, score in index._extract(index._process_query(record), score_cutoff, limit):
+            if index._is_lowered:
+                score = int(round(score))
+            right_key = index._keys[position] if index._is_mapping else position
+            results.append((left_key, right_key, score))
+
+    return results
+
+
+def match_lists(
+    left: t.Union[_ChoicesMap[_T], _Choices],
+    right: t.Union[_ChoicesMap[_T], _Choices, ChoiceIndex],
+    processor: t.Optional[_Processor] = default_processor,
+    scorer: _Scorer = default_scorer,
+    score_cutoff: t.Optional[float] = 0,
+    limit: t.Optional[int] = 1,
+    workers: int = 1,
+    chunk_size: int = 1000,
+) -> t.Iterator[t.Tuple[t.Any, t.Any, float]]:
+    """
+    Link every record in left to its best matches in right.
+
+    The right records are processed a single time, unlike when calling
+    extractOne() for every left record. Results are generated while left is
+    consumed, in the order of left and then of the score, like extractBests().
+
+    Args:
+        left: A list or dictionary of records to look up. None records are
+            skipped.
+        right: A list or dictionary of records to link them to, suitable for
+            use with extract(). This can also be a ChoiceIndex, e.g. an
+            index.TokenIndex that only scores right records sharing a token
+            with the left record (blocking). processor and scorer are ignored
+            then, the ones of the index are used.
+        processor: Optional function for transforming records before matching.
+            See extract().
+        scorer: Scoring function for extract().
+        score_cutoff: Optional argument for score threshold. No matches with
+            a score less than this number will be returned. Defaults to 0.
+        limit: Optional maximum for the number of matches per left record.
+            Defaults to 1.
+        workers: The number of threads left records are matched in. This only
+            helps for the scorers in thefuzz.fuzz, which release the GIL.
+            -1 uses all available cores. Defaults to 1.
+        chunk_size: The number of left records matched at a time. Defaults
+            to 1000.
+
+    Returns:
+        Generator of (left_key, right_key, score) tuples. The keys are the
+        positions of the records for lists and the keys for dictionaries.
+    """
+    index = right if isinstance(right, ChoiceIndex) else ChoiceIndex(right, processor=processor, scorer=scorer)
+    chunks = _iter_chunks(left, chunk_size)
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from _match_chunk(index, chunk, score_cutoff, limit)
+        return
+
+    if workers < 1:
+        workers = os.cpu_count() or 1
+
+    with ThreadPoolExecutor(workers) as executor:
+        # only a few chunks are scheduled ahead, so left is consumed lazily
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_match_chunk, index, chunk, score_cutoff, limit))
+            if len(pending) > 2 * workers:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _iter_chunks(choices, chunk_size):
+    """
+    Splits choices into lists of (key, choice) pairs, without materializing
+    more than chunk_size choices at a time
+    """
+    if hasattr(choices, "items"):
+        it = iter(choices.items())
+    else:
+        it = enumerate(choices)
+
+    while True:
+        chunk = list(itertools.islice(it, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _extract_chunk(processed_query, chunk, processor, scorer, score_cutoff, limit):
+    """
+    Best matches of processed_query in a chunk from _iter_chunks
+    """
+    return rprocess.extract(
+        processed_query, _preprocess_choices([choice for _, choice in chunk], processor),
+        processor=None,
+        scorer=scorer,
+        score_cutoff=score_cutoff,
+        limit=limit
+    )
+
+
+class _BestMatches:
+    """
+    The best matches over consecutive chunks of choices, ordered like the
+    results of rprocess.extract
+    """
+
+    def __init__(self, limit):
+        self._limit = limit
+        # min heap of (score, -position, choice, key), so the worst match is on top
+        self._heap = []
+        self._position = 0
+
+    def add(self, chunk, results):
+        for _, score, index in results:
+            key, choice = chunk[index]
+            entry = (score, -(self._position + index), choice, key)
+            if self._limit is None or len(self._heap) < self._limit:
+                heapq.heappush(self._heap, entry)
+            elif entry[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, entry)
+
+        self._position += len(chunk)
+
+    def results(self, is_mapping, is_lowered):
+        results = []
+        for score, _, choice, key in sorted(self._heap, key=lambda x: x[:2], reverse=True):
+            if is_lowered:
+                score = int(round(score))
+
+            results.append((choice, score, key) if is_mapping else (choice, score))
+
+        return results
+
+
+class ExtractStats:
+    """
+    Counters for extractBests(adaptive_cutoff=True). The counts of every call
+    the object is passed to are added up.
+
+    Attributes:
+        choices: The number of choices, not counting None
+        pruned: The number of choices that were scored with a raised
+            score_cutoff and rejected, and of choices that were not scored
+            at all, once limit matches with the maximum score of 100 were
+            found by a scorer of thefuzz.fuzz.
+        score_cutoff: The score_cutoff the last call ended with
+    """
+
+    def __init__(self):
+        self.choices = 0
+        self.pruned = 0
+        self.score_cutoff = None
+
+    def __repr__(self):
+        return (f"ExtractStats(choices={self.choices}, pruned={self.pruned}, "
+                f"score_cutoff={self.score_cutoff})")
+
+
+# the cutoff is raised after each chunk, so the first chunk is scored with
+# the cutoff that was passed in. Later chunks are twice as large as the
+# previous one, up to _ADAPTIVE_MAX_CHUNK_SIZE
+_ADAPTIVE_CHUNK_SIZE = 1000
+_ADAPTIVE_MAX_CHUNK_SIZE = 64000
+
+
+def _extract_adaptive(processed_query, processed_choices, scorer, score_cutoff, limit, is_lowered, stats):
+    """
+    extractBests(adaptive_cutoff=True) over the processed choices from
+    _process_choices. Returns (choice, score, position) tuples of the
+    processed choices, ordered like the results of rprocess.extract
+    """
+    # min heap of (score, -index), so the worst match is on top
+    heap = []
+    cutoff = score_cutoff
+    offset = 0
+    chunk_size = _ADAPTIVE_CHUNK_SIZE
+    while offset < len(processed_choices):
+        chunk = processed_choices[offset:offset + chunk_size]
+        results = rprocess.extract(
+            processed_query, chunk,
+            processor=None,
+            scorer=scorer,
+            score_cutoff=cutoff,
+            limit=limit
+        )
+
+        for _, score, index in results:
+            entry = (score, -(offset + index))
+            if limit is None or len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        if stats is not None:
+            count = len(chunk) - chunk.count(None)
+            stats.choices += count
+            if cutoff != score_cutoff:
+                stats.pruned += count - len(results)
+
+        offset += len(chunk)
+        chunk_size = min(2 * chunk_size, _ADAPTIVE_MAX_CHUNK_SIZE)
+
+        if limit is None or len(heap) < limit:
+            continue
+        # ties are won by the earlier choice, so a choice has to reach the
+        # worst score in the heap to still be one of the best matches
+        cutoff = max(score_cutoff or 0, heap[0][0])
+        # lowered scorers can not beat a perfect score, so no remaining choice
+        # can be a better match
+        if is_lowered and cutoff >= 100:
+            if stats is not None:
+                rest = processed_choices[offset:]
+                stats.choices += len(rest) - rest.count(None)
+                stats.pruned += len(rest) - rest.count(None)
+            break
+
+    if stats is not None:
+        stats.score_cutoff = cutoff
+
+    return [(processed_choices[-index], score, -index) for score, index in sorted(heap, reverse=True)]
+
+
+def extract_stream(
+    query: str,
+    choices: t.Union[_ChoicesMap[_T], _Choices],
+    processor: t.Optional[_Processor] = default_processor,
+    scorer: _Scorer = default_scorer,
+    score_cutoff: t.Optional[float] = 0,
+    limit: t.Optional[int] = 5,
+    chunk_size: int = 10000,
+) -> t.Union[t.List[_MappedResult[_T]], t.List[_Result]]:
+    """
+    Get a list of the best matches from a stream of choices.
+
+    This returns the same results as extractBests(), but consumes choices
+    chunk by chunk, e.g. from a generator or read_choices(). Only the current
+    chunk and the best limit matches are kept in memory.
+
+    Args:
+        query: A string to match against
+        choices: An iterable or dictionary-like object containing choices.
+            See extract().
+        processor: Optional function for transforming choices before matching.
+            See extract().
+        scorer: Scoring function for extract().
+        score_cutoff: Optional argument for score threshold. No matches with
+            a score less than this number will be returned. Defaults to 0.
+        limit: Optional maximum for the number of elements returned. When this
+            is None, every match is kept in memory. Defaults to 5.
+        chunk_size: The number of choices scored at a time. Defaults to 10000.
+
+    Returns: A a list of (match, score) tuples.
+    """
+    is_mapping = hasattr(choices, "items")
+    is_lowered = _is_lowered(scorer)
+
+    processor = _get_processor(processor, scorer)
+    rf_scorer = _get_scorer(scorer)
+    processed_query = _preprocess_query(query, processor)
+
+    best = _BestMatches(limit)
+    for chunk in _iter_chunks(choices, chunk_size):
+        best.add(chunk, _extract_chunk(processed_query, chunk, processor, rf_scorer, score_cutoff, limit))
+
+    return best.results(is_mapping, is_lowered)
+
+
+def read_choices(path: str, encoding: str = "utf-8") -> t.Iterator[str]:
+    """
+    Lazily read the lines of a newline-delimited file as choices, e.g. for
+    extract_stream().
+
+    Args:
+        path: The file to read
+        encoding: The encoding of the file. Defaults to utf-8.
+
+    Returns: A generator of the lines without their line endings.
+    """
+    with open(path, encoding=encoding) as f:
+        for line in f:
+            yield line.rstrip("\r\n")
+
+
+def cdist(
+    queries: t.Iterable[str],
+    choices: t.Union[_ChoicesMap[_T], _Choices],
+    processor: t.Optional[_Processor] = default_processor,
+    scorer: _Scorer = default_scorer,
+    score_cutoff: t.Optional[float] = 0,
+    workers: int = 1,
+):
+    """
+    Compute the scores between every query and every choice.
+
+    This requires numpy to be installed.
+
+    Args:
+        queries: An iterable of strings to match against
+        choices: A list or dictionary of choices, suitable for use with
+            extract(). For a dictionary the values are scored.
+        processor: Optional function for transforming choices before matching.
+            See extract().
+        scorer: Scoring function for extract().
+        score_cutoff: Optional argument for score threshold. Scores less than
+            this number are set to 0. Defaults to 0.
+        workers: The number of threads used to calculate the scores. -1 uses
+            all available cores. Defaults to 1.
+
+    Returns:
+        A numpy array of shape (len(queries), len(choices)). Scores of the
+        built-in scorers are rounded to integers like in extract().
+    """
+    import numpy as np
+
+    if hasattr(choices, "items"):
+        choices = [choice for _, choice in choices.items()]
+
+    processor = _get_processor(processor, scorer)
+    queries = list(queries)
+
+    scores = rprocess.cdist(
+        [_preprocess_query(query, processor) for query in queries],
+        _preprocess_choices(choices, processor),
+        processor=None,
+        scorer=_get_scorer(scorer),
+        score_cutoff=score_cutoff,
+        workers=workers
+    )
+
+    if _is_lowered(scorer):
+        scores = np.rint(scores).astype(np.uint8)
+
+    return scores
+
+
 _TC = t.TypeVar("_TC", bound=t.Collection[str])
 
 
@@ -406,6 +1495,7 @@ def dedupe(
     contains_dupes: _TC,
     threshold: float = 70,
     scorer: _Scorer = fuzz.token_set_ratio,
+    workers: int = 1,
 ) -> t.Union[t.List[str], _TC]:
     """
     This convenience function takes a list of strings containing duplicates and uses fuzzy matching to identify
@@ -427,6 +1517,9 @@ def dedupe(
             of the form f(query, choice) -> int.
             By default, fuzz.token_set_ratio() is used and expects both query and
             choice to be strings.
+        workers: The number of workers the items are split across, using
+            threads or processes like extract(). -1 uses all available cores.
+            Defaults to 1.
 
     Returns:
         A deduplicated list. For example:
@@ -435,9 +1528,331 @@ def dedupe(
             In: dedupe(contains_dupes)
             Out: ['Frodo Baggins', 'Samwise G.', 'Bilbo Baggins', 'Gandalf']
     """
-    deduped = set()
-    for item in contains_dupes:
-        matches = extractBests(item, contains_dupes, scorer=scorer, score_cutoff=threshold, limit=None)
-        deduped.add(max(matches, key=lambda x: (len(x[0]), x[0]))[0])
+    call_stats = instrument.CallStats("process.dedupe") if instrument._hook is not None else None
+
+    if workers == 1:
+        deduped = set(_dedupe_shard(contains_dupes, contains_dupes, scorer, threshold, call_stats)[0])
+    else:
+        if workers < 1:
+            workers = os.cpu_count() or 1
+
+        # one executor for the whole call, every worker looks up a shard of the items
+        items = list(contains_dupes)
+        shard_size = max(1, -(-len(items) // workers))
+        with _get_executor(default_processor, scorer, workers) as executor:
+            futures = [
+                executor.submit(_dedupe_shard, items[offset:offset + shard_size], contains_dupes, scorer,
+                                threshold, None if call_stats is None else instrument.CallStats("process.dedupe"))
+                for offset in range(0, len(items), shard_size)
+            ]
+            deduped = set()
+            for future in futures:
+                representatives, shard_stats = future.result()
+                deduped.update(representatives)
+                if call_stats is not None:
+                    for name in instrument.CallStats.__slots__[1:]:
+                        setattr(call_stats, name, getattr(call_stats, name) + getattr(shard_stats, name))
+
+    if call_stats is not None:
+        instrument._hook(call_stats)
 
     return list(deduped) if len(deduped) != len(contains_dupes) else contains_dupes
+
+
+def _dedupe_shard(items, contains_dupes, scorer, threshold, call_stats):
+    """
+    The representatives of the duplicates of every item in contains_dupes, and
+    call_stats for the workers of dedupe(), which can not share it
+    """
+    representatives = []
+    for item in items:
+        matches = _extract_bests(item, contains_dupes, default_processor, scorer, threshold, None, 1,
+                                 False, None, call_stats)
+        representatives.append(max(matches, key=lambda x: (len(x[0]), x[0]))[0])
+
+    return representatives, call_stats
+
+
+def _ngram_keys(s, n):
+    """
+    Blocking keys of a processed string: the character n-grams of every token.
+    Tokens shorter than n are used as a key of their own.
+    """
+    keys = set()
+    for token in s.split():
+        if len(token) <= n:
+            keys.add(token)
+        else:
+            keys.update(token[i:i + n] for i in range(len(token) - n + 1))
+    return keys
+
+
+def dedupe_blocked(
+    contains_dupes: _TC,
+    threshold: float = 70,
+    scorer: _Scorer = fuzz.token_set_ratio,
+    ngram_size: int = 3,
+    max_bucket_size: t.Optional[int] = 500,
+) -> t.Union[t.List[str], _TC]:
+    """
+    A version of dedupe() that scales to large lists of strings.
+
+    Instead of scoring every item against every other item, the items are put
+    into buckets by the character n-grams of their processed tokens and only
+    items sharing a bucket are scored. Like in dedupe(), every item is then
+    represented by its longest match scoring at least threshold, with ties
+    broken alphabetically, and the result holds these representatives. Matches
+    are not followed transitively: a representative that is itself a duplicate
+    of a longer item is kept, so the result is the one of dedupe() whenever
+    all the matches share a bucket. Items with the same non-empty processed
+    string have the same matches without being scored, and only one of them
+    is put into the buckets. The scorer is expected to be symmetric, every
+    pair of items is only scored once.
+
+    Buckets of n-grams that most items share (e.g. "new" or "the") make both
+    finding and scoring the candidates quadratic, so buckets with more than
+    max_bucket_size items are skipped. Two items that only share such common
+    n-grams are then not compared, so duplicates consisting of common words
+    only can be missed. Raise max_bucket_size, or pass None, for a higher
+    recall on smaller lists.
+
+    Args:
+        contains_dupes: A list of strings that we would like to dedupe.
+        threshold: the numerical value (0,100) point at which we expect to find duplicates.
+            Defaults to 70 out of 100
+        scorer: Optional function for scoring matches between two processed items.
+            See dedupe().
+        ngram_size: Length of the character n-grams used as buckets. Defaults to 3.
+        max_bucket_size: Optional maximum number of items in a bucket. Larger buckets
+            (usually very common n-grams) are skipped when looking for candidates,
+            which trades some recall for speed. Defaults to 500.
+
+    Returns:
+        A deduplicated list with the representatives, in order of the first item
+        they represent. If no duplicates were found, contains_dupes is returned.
+    """
+    items = list(contains_dupes)
+    processor = _get_processor(default_processor, scorer)
+    processed = _preprocess_choices(items, processor)
+    rf_scorer = _get_scorer(scorer)
+
+    # items with the same non-empty processed string have the same matches,
+    # so they are scored once as a group, represented by their longest item
+    groups = {}
+    group_of = []
+    group_processed = []
+    longest = []
+    group_keys = []
+    for i, s in enumerate(processed):
+        group = groups.get(s) if s else None
+        if group is None:
+            group = len(longest)
+            if s:
+                groups[s] = group
+            group_processed.append(s)
+            longest.append(items[i])
+            group_keys.append(_ngram_keys(s, ngram_size) if s else set())
+        elif (len(items[i]), items[i]) > (len(longest[group]), longest[group]):
+            longest[group] = items[i]
+        group_of.append(group)
+
+    buckets = {}
+    for group, keys in enumerate(group_keys):
+        for key in keys:
+            buckets.setdefault(key, []).append(group)
+
+    # the longest match of every group, every pair of groups is scored once
+    best = list(longest)
+    for group, keys in enumerate(group_keys):
+        candidates = set()
+        for key in keys:
+            bucket = buckets[key]
+            if max_bucket_size is not None and len(bucket) > max_bucket_size:
+                continue
+            candidates.update(bucket[bisect_right(bucket, group):])
+        if not candidates:
+            continue
+
+        candidates = list(candidates)
+        matches = rprocess.extract(
+            group_processed[group], [group_processed[j] for j in candidates],
+            processor=None,
+            scorer=rf_scorer,
+            score_cutoff=threshold,
+            limit=None
+        )
+        for _, _, index in matches:
+            other = candidates[index]
+            if (len(longest[other]), longest[other]) > (len(best[group]), best[group]):
+                best[group] = longest[other]
+            if (len(longest[group]), longest[group]) > (len(best[other]), best[other]):
+                best[other] = longest[group]
+
+    deduped = list(dict.fromkeys(best[group] for group in group_of))
+    return deduped if len(deduped) != len(items) else contains_dupes
+
+
+class Deduper:
+    """
+    An incremental dedupe, for items arriving in batches.
+
+    Every added item is only scored against the earlier items that are
+    candidates for a match, by default the items sharing a character n-gram
+    of their processed tokens. The item joins the cluster of its best match
+    scoring at least threshold, or starts a cluster of its own, and every
+    cluster is represented by its longest item with ties broken
+    alphabetically, like in dedupe(). Items with the same non-empty processed
+    string as an earlier item join its cluster without being scored. Adding
+    the items in one or in several batches gives the same clusters.
+
+    By default an item is only scored against the representatives of the
+    clusters with a candidate, which makes the cost of adding an item grow
+    with the number of clusters rather than the number of items. Without
+    representatives_only it is scored against every candidate, and can join
+    a cluster by matching any of its items. Clusters are never merged, so
+    matches are not followed transitively, but the representatives are not
+    the ones of dedupe() either: dedupe() keeps the longest match of every
+    item, also when that match is a duplicate of a longer item, and keeps
+    more items than there are clusters. Use dedupe_blocked() for its result.
+
+    Like in dedupe_blocked(), n-grams shared by more than max_bucket_size
+    items are ignored when looking for candidates, which keeps the cost of
+    adding an item from growing with the number of items, at the cost of
+    missing duplicates that only share common n-grams.
+
+    Clusters are identified by the position of their first item, counting
+    the items in the order they were added.
+
+    Arguments:
+        threshold: the numerical value (0,100) point at which we expect to find duplicates.
+            Defaults to 70 out of 100
+        scorer: Optional function for scoring matches between two processed items.
+            See dedupe().
+        ngram_size: Length of the character n-grams used to find candidates.
+            Defaults to 3.
+        max_bucket_size: Optional maximum number of items sharing an n-gram.
+            More common n-grams are ignored when looking for candidates, which
+            trades some recall for speed. Defaults to 500.
+        index: Optional empty ChoiceIndex the items are added to and looked up
+            in, instead of an index.TokenIndex of the n-grams. Its processor
+            and scorer are used, ngram_size and max_bucket_size are ignored.
+        representatives_only: Only score items against the representatives
+            of the candidate clusters. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 70,
+        scorer: _Scorer = fuzz.token_set_ratio,
+        ngram_size: int = 3,
+        max_bucket_size: t.Optional[int] = 500,
+        index: t.Optional[ChoiceIndex] = None,
+        representatives_only: bool = True,
+    ):
+        if index is None:
+            from .index import TokenIndex
+            index = TokenIndex([], scorer=scorer, ngram_size=ngram_size, fallback=False,
+                               max_postings=max_bucket_size)
+        elif index._is_mapping or len(index._choices):
+            raise ValueError("the index of a Deduper has to be an empty index of a list")
+
+        self.threshold = threshold
+        self.representatives_only = representatives_only
+        self._index = index
+        # position -> cluster id, cluster id -> positions of the items and of the representative
+        self._cluster_ids = []
+        self._members = {}
+        self._representatives = {}
+        # processed item -> position of the first item
+        self._first = {}
+
+    def __len__(self):
+        return len(self._index._choices)
+
+    def add(self, items: t.Iterable[str]) -> t.List[int]:
+        """
+        Add a batch of items. Every item is scored against the candidates
+        among the items added before it, including earlier items of the batch.
+
+        Returns: The cluster ids of the items
+        """
+        index = self._index
+        cluster_ids = []
+        for item in items:
+            processed = index._processor(item) if index._processor else item
+            position = len(self._cluster_ids)
+
+            # empty items are not scored, like the empty query in extract()
+            if not processed:
+                cluster_id = None
+            else:
+                first = self._first.setdefault(processed, position)
+                cluster_id = self._matching_cluster(processed) if first == position else self._cluster_ids[first]
+            index._add(item, processed=processed)
+
+            if cluster_id is None:
+                cluster_id = position
+                self._members[cluster_id] = []
+                self._representatives[cluster_id] = position
+            else:
+                rep = index._choices[self._representatives[cluster_id]]
+                if (len(item), item) > (len(rep), rep):
+                    self._representatives[cluster_id] = position
+            self._members[cluster_id].append(position)
+            self._cluster_ids.append(cluster_id)
+            cluster_ids.append(cluster_id)
+
+        return cluster_ids
+
+    def _matching_cluster(self, processed):
+        """
+        Id of the cluster of the best match scoring at least threshold against
+        the processed item among the candidates of the index, or None
+        """
+        index = self._index
+        candidates = index._candidates(processed, self.threshold)
+        if candidates is None:
+            candidates = [position for position, choice in enumerate(index._processed) if choice is not None]
+
+        if self.representatives_only:
+            positions = [self._representatives[cluster_id]
+                         for cluster_id in sorted({self._cluster_ids[position] for position in candidates})]
+        else:
+            positions = candidates
+
+        match = rprocess.extractOne(
+            processed, {position: index._processed[position] for position in positions},
+            processor=None,
+            scorer=index._scorer,
+            score_cutoff=self.threshold
+        )
+        return None if match is None else self._cluster_ids[match[2]]
+
+    def cluster_id(self, position: int) -> int:
+        """
+        The cluster id of the item at position
+        """
+        return self._cluster_ids[position]
+
+    def representative(self, cluster_id: int) -> str:
+        """
+        The representative of the cluster: its longest item, like the item
+        dedupe() keeps.
+        """
+        return self._index._choices[self._representatives[cluster_id]]
+
+    def clusters(self) -> t.Dict[int, t.List[str]]:
+        """
+        The items of every cluster, by cluster id in the order they were added
+        """
+        choices = self._index._choices
+        return {cluster_id: [choices[position] for position in members]
+                for cluster_id, members in self._members.items()}
+
+    def representatives(self) -> t.List[str]:
+        """
+        The representative of every cluster, in the order of the cluster ids.
+        This is the deduplicated list of the items added so far.
+        """
+        choices = self._index._choices
+        return [choices[position] for position in self._representatives.values()]
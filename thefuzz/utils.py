@@ -1,22 +1,155 @@
+from collections import OrderedDict
+from functools import lru_cache
+import threading
+import time
+import unicodedata
+
 from rapidfuzz.utils import default_process as _default_process
 
 translation_table = {i: None for i in range(128, 256)}  # ascii dammit!
 
+_cached_full_process = None
+
 
 def ascii_only(s):
+    if s.isascii():
+        return s
     return s.translate(translation_table)
 
 
-def full_process(s, force_ascii=False):
+def ascii_fold(s):
+    """
+    Transliterate s to ASCII by removing the accents of characters
+    ("\u00e9" -> "e", "\u00c5" -> "A"). Characters without an ASCII
+    decomposition are removed.
+    """
+    if s.isascii():
+        return s
+    return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+
+
+def _full_process(s, force_ascii, transliterate=False):
+    if force_ascii:
+        s = ascii_fold(str(s)) if transliterate else ascii_only(str(s))
+
+    return _default_process(s)
+
+
+def full_process(s, force_ascii=False, transliterate=False):
     """
     Process string by
     -- removing all but letters and numbers
     -- trim whitespace
     -- force to lower case
-    if force_ascii == True, force convert to ascii
+    if force_ascii == True, force convert to ascii, by removing the
+    non-ASCII characters or, if transliterate == True, with ascii_fold
+
+    Results are memoized while the cache is enabled (see enable_cache)
     """
+    if _cached_full_process is not None:
+        try:
+            return _cached_full_process(s, force_ascii, transliterate)
+        except TypeError:  # unhashable input
+            pass
 
-    if force_ascii:
-        s = ascii_only(str(s))
+    return _full_process(s, force_ascii, transliterate)
 
-    return _default_process(s)
+
+def enable_cache(maxsize=4096):
+    """
+    Memoize the results of full_process, which is also used by the fuzz
+    scorers and the process functions. Once maxsize results are stored the
+    least recently used result is evicted. Enabling the cache again replaces
+    the existing cache.
+    """
+    global _cached_full_process
+    _cached_full_process = lru_cache(maxsize=maxsize, typed=True)(_full_process)
+
+
+def disable_cache():
+    """
+    Stop memoizing the results of full_process and drop the cached results
+    """
+    global _cached_full_process
+    _cached_full_process = None
+
+
+def cache_info():
+    """
+    Hits, misses, maxsize and current size of the full_process cache,
+    or None when the cache is disabled
+    """
+    if _cached_full_process is None:
+        return None
+    return _cached_full_process.cache_info()
+
+
+def cache_clear():
+    """
+    Drop the cached results and reset the hit and miss counters
+    """
+    if _cached_full_process is not None:
+        _cached_full_process.cache_clear()
+
+
+class ScoreCache:
+    """
+    Cache of scores for pairs of processed strings, see fuzz.set_score_cache.
+
+    Entries are stored in backend, which defaults to an in-process dict.
+    Any mutable mapping with string keys can be used instead, e.g. a shelve
+    for a cache that persists between runs. Once maxsize entries are stored
+    the entry that was used least recently (for dict backends) or that comes
+    first in the backend is evicted. Entries older than ttl seconds are
+    ignored and removed.
+    """
+
+    def __init__(self, maxsize=None, ttl=None, backend=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict() if backend is None else backend
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(scorer_name, s1, s2):
+        return repr((scorer_name, s1, s2))
+
+    def get(self, key):
+        """
+        The cached score for key, or None
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                score, created = entry
+                if self.ttl is None or time.time() - created <= self.ttl:
+                    if isinstance(self._data, OrderedDict):
+                        self._data.move_to_end(key)
+                    self.hits += 1
+                    return score
+
+                del self._data[key]
+
+            self.misses += 1
+            return None
+
+    def set(self, key, score):
+        with self._lock:
+            self._data[key] = (score, time.time())
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    del self._data[next(iter(self._data))]
+
+    def clear(self):
+        """
+        Remove all entries and reset the hit and miss counters
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
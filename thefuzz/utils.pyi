@@ -1,3 +1,23 @@
+from functools import _CacheInfo
+from typing import MutableMapping, Optional, Tuple
 
 def ascii_only(s: str) -> str: ...
-def full_process(s: str, force_ascii: bool = ...) -> str: ...
+def ascii_fold(s: str) -> str: ...
+def full_process(s: str, force_ascii: bool = ..., transliterate: bool = ...) -> str: ...
+def enable_cache(maxsize: Optional[int] = ...) -> None: ...
+def disable_cache() -> None: ...
+def cache_info() -> Optional[_CacheInfo]: ...
+def cache_clear() -> None: ...
+
+class ScoreCache:
+    maxsize: Optional[int]
+    ttl: Optional[float]
+    hits: int
+    misses: int
+    def __init__(self, maxsize: Optional[int] = ..., ttl: Optional[float] = ..., backend: Optional[MutableMapping[str, Tuple[int, float]]] = ...) -> None: ...
+    @staticmethod
+    def make_key(scorer_name: str, s1: str, s2: str) -> str: ...
+    def get(self, key: str) -> Optional[int]: ...
+    def set(self, key: str, score: int) -> None: ...
+    def clear(self) -> None: ...
+    def __len__(self) -> int: ...